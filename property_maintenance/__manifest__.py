@@ -46,6 +46,7 @@
         'data/maintenance_sequence.xml',
         'data/maintenance_category_data.xml',
         'data/maintenance_stage_data.xml',
+        'data/maintenance_cron.xml',
         'data/default_user_groups.xml',
         'data/module_installation_message.xml',
         
@@ -62,6 +63,10 @@
         'views/maintenance_request_views.xml',
         'views/work_order_views.xml',
         'views/preventive_maintenance_views.xml',
+        'views/maintenance_portfolio_rollup_views.xml',
+        'views/maintenance_technician_workload_views.xml',
+        'views/maintenance_contractor_scorecard_views.xml',
+        'views/maintenance_bulk_operation_views.xml',
         
         # Views - Supporting
         'views/maintenance_team_views.xml',
@@ -82,6 +87,9 @@
         # Wizards
         'wizard/convert_to_work_order_views.xml',
         'wizard/maintenance_cost_analysis_views.xml',
+        'wizard/maintenance_request_transition_views.xml',
+        'wizard/work_order_dispatch_views.xml',
+        'wizard/work_order_invoice_views.xml',
         
         # Menu
         'views/maintenance_menu.xml',
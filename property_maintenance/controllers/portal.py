@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http, _
+from odoo.exceptions import AccessError, MissingError
+from odoo.http import request
+from datetime import datetime
+from odoo.addons.portal.controllers.portal import CustomerPortal
+
+PORTAL_PAGE_SIZE = 20
+
+
+class MaintenancePortal(CustomerPortal):
+
+    def _prepare_home_portal_values(self, counters):
+        values = super(MaintenancePortal, self)._prepare_home_portal_values(counters)
+        if 'maintenance_request_count' in counters:
+            # Stored on the partner and refreshed on request changes: no count query here
+            values['maintenance_request_count'] = request.env.user.partner_id.sudo().maintenance_request_count
+        return values
+
+    def _get_maintenance_request_domain(self):
+        partner = request.env.user.partner_id
+        return ['|', ('tenant_id', '=', partner.id), ('owner_id', '=', partner.id)]
+
+    @staticmethod
+    def _encode_cursor(maintenance_request):
+        # Keep the microseconds: the seek compares with the stored create_date,
+        # shared by all the requests created in one transaction
+        create_date = maintenance_request.create_date.isoformat(timespec='microseconds')
+        return '%s_%s' % (create_date, maintenance_request.id)
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            create_date, record_id = cursor.rsplit('_', 1)
+            return datetime.fromisoformat(create_date), int(record_id)
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def _seek_maintenance_requests(self, domain, after=None, before=None, limit=PORTAL_PAGE_SIZE):
+        """Return one page of requests, newest first, seeking on
+        ``(create_date, id)`` from a cursor instead of skipping rows with
+        OFFSET, so deep pages cost the same as the first one.
+
+        :return: ``(requests, has_previous, has_next)``
+        """
+        MaintenanceRequest = request.env['maintenance.request']
+        cursor = self._decode_cursor(after or before)
+        backwards = bool(before and cursor)
+        if cursor:
+            create_date, record_id = cursor
+            operator = '>' if backwards else '<'
+            domain = domain + [
+                '|', ('create_date', operator, create_date),
+                '&', ('create_date', '=', create_date), ('id', operator, record_id),
+            ]
+        order = 'create_date asc, id asc' if backwards else 'create_date desc, id desc'
+        requests = MaintenanceRequest.search(domain, order=order, limit=limit + 1)
+        has_more = len(requests) > limit
+        requests = requests[:limit]
+        if backwards:
+            return requests[::-1], has_more, True
+        return requests, bool(cursor), has_more
+
+    @http.route(['/my/maintenance'], type='http', auth='user', website=True)
+    def portal_my_maintenance_requests(self, after=None, before=None, **kw):
+        requests, has_previous, has_next = self._seek_maintenance_requests(
+            self._get_maintenance_request_domain(), after=after, before=before)
+        values = self._prepare_portal_layout_values()
+        values.update({
+            'maintenance_requests': requests,
+            'page_name': 'maintenance',
+            'default_url': '/my/maintenance',
+            'previous_url': '/my/maintenance?before=%s' % self._encode_cursor(requests[0])
+                            if has_previous and requests else False,
+            'next_url': '/my/maintenance?after=%s' % self._encode_cursor(requests[-1])
+                        if has_next and requests else False,
+        })
+        return request.render('property_maintenance.portal_my_maintenance_requests', values)
+
+    @http.route(['/my/maintenance/<int:request_id>'], type='http', auth='public', website=True)
+    def portal_my_maintenance_request(self, request_id, access_token=None, **kw):
+        try:
+            request_sudo = self._document_check_access('maintenance.request', request_id, access_token)
+        except (AccessError, MissingError):
+            return request.redirect('/my')
+        values = self._get_page_view_values(request_sudo, access_token, {
+            'maintenance_request': request_sudo,
+            'page_name': 'maintenance_request',
+        }, 'my_maintenance_requests_history', False)
+        return request.render('property_maintenance.portal_my_maintenance_request', values)
+
+    def _get_portal_units(self):
+        partner = request.env.user.partner_id.sudo()
+        return partner.tenant_unit_ids | partner.owner_unit_ids
+
+    @http.route(['/my/maintenance/new'], type='http', auth='user', methods=['GET', 'POST'], website=True)
+    def portal_new_maintenance_request(self, **post):
+        units = self._get_portal_units()
+        categories = request.env['maintenance.category'].sudo().search([])
+        error = {}
+        if request.httprequest.method == 'POST':
+            unit = units.filtered(lambda u: str(u.id) == post.get('unit_id'))
+            category = categories.filtered(lambda c: str(c.id) == post.get('category_id'))
+            if not unit:
+                error['unit_id'] = _('Please select one of your units.')
+            if not category:
+                error['category_id'] = _('Please select a category.')
+            if not (post.get('title') or '').strip():
+                error['title'] = _('Please describe the issue in a few words.')
+            if not error:
+                partner = request.env.user.partner_id
+                # The unit was checked against the partner's units above
+                maintenance_request = request.env['maintenance.request'].sudo().create({
+                    'title': post['title'].strip(),
+                    'description': post.get('description') or post['title'],
+                    'property_id': unit.property_id.id,
+                    'building_id': unit.building_id.id,
+                    'unit_id': unit.id,
+                    'category_id': category.id,
+                    'requester_partner_id': partner.id,
+                    'tenant_id': unit.tenant_id.id if unit.tenant_id == partner else False,
+                    'owner_id': unit.owner_id.id,
+                    'company_id': unit.company_id.id or request.env.company.id,
+                })
+                return request.redirect(maintenance_request.get_portal_url())
+        values = self._prepare_portal_layout_values()
+        values.update({
+            'units': units,
+            'categories': categories,
+            'error': error,
+            'post': post,
+            'page_name': 'maintenance_new',
+        })
+        return request.render('property_maintenance.portal_new_maintenance_request', values)
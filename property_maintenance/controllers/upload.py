@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from odoo import http, _
+from odoo.exceptions import AccessError, UserError
+from odoo.http import request
+import json
+
+from ..models.maintenance_upload_session import UPLOAD_CHUNK_SIZE, UPLOAD_TARGETS
+
+
+class MaintenanceUploadController(http.Controller):
+    """Chunked, resumable uploads of request and work order photos/videos.
+
+    1. ``/maintenance/upload/start`` opens a session for a record the user
+       can edit and returns its token and the preferred chunk size;
+    2. each chunk is sent as the raw body of ``/maintenance/upload/<token>``
+       with its byte ``offset``; after a failure, ``/status`` tells where to
+       resume;
+    3. ``/finish`` assembles the file into a deduplicated attachment.
+    """
+
+    def _get_session(self, token):
+        session = request.env['maintenance.upload.session'].sudo().search([('token', '=', token)], limit=1)
+        if not session or session.user_id != request.env.user:
+            raise AccessError(_('Unknown upload session.'))
+        return session
+
+    @http.route('/maintenance/upload/start', type='json', auth='user')
+    def upload_start(self, res_model, res_id, name, size, mimetype=None, checksum=None):
+        if res_model not in UPLOAD_TARGETS:
+            raise UserError(_('Uploads are not supported on %s.') % res_model)
+        record = request.env[res_model].browse(int(res_id)).exists()
+        if not record:
+            raise UserError(_('The document does not exist anymore.'))
+        # The attachment is linked with sudo on finish: require the right to edit the document
+        record.check_access_rights('write')
+        record.check_access_rule('write')
+        session = request.env['maintenance.upload.session'].sudo()._start(
+            res_model, record.id, name, size, mimetype=mimetype, checksum=checksum)
+        return {'token': session.token, 'chunk_size': UPLOAD_CHUNK_SIZE, 'received_size': 0}
+
+    @http.route('/maintenance/upload/<string:token>/status', type='json', auth='user')
+    def upload_status(self, token):
+        session = self._get_session(token)
+        return {'received_size': session.received_size, 'total_size': session.total_size, 'state': session.state}
+
+    @http.route('/maintenance/upload/<string:token>', type='http', auth='user', methods=['PUT', 'POST'],
+                csrf=False)
+    def upload_chunk(self, token, offset=0, **kw):
+        session = self._get_session(token)
+        length = request.httprequest.content_length or 0
+        # Read from the WSGI stream: the chunk is never materialized as a whole
+        received_size = session._write_chunk(int(offset), request.httprequest.stream, length)
+        return request.make_response(json.dumps({'received_size': received_size}),
+                                     headers=[('Content-Type', 'application/json')])
+
+    @http.route('/maintenance/upload/<string:token>/finish', type='json', auth='user')
+    def upload_finish(self, token):
+        attachment = self._get_session(token)._finish()
+        return {'attachment_id': attachment.id, 'name': attachment.name}
@@ -1,5 +1,9 @@
 # -*- coding: utf-8 -*-
 
+from . import ir_attachment
+from . import ir_sequence
+from . import maintenance_count_mixin
+from . import maintenance_bulk_tracking_mixin
 from . import res_partner
 from . import maintenance_category
 from . import maintenance_stage
@@ -14,3 +18,7 @@ from . import maintenance_team
 from . import technician
 from . import contractor
 from . import maintenance_cost_line
+from . import maintenance_portfolio_rollup
+from . import maintenance_technician_workload
+from . import maintenance_contractor_scorecard
+from . import maintenance_upload_session
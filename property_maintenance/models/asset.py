@@ -1,19 +1,29 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api
+from collections import defaultdict
+import logging
+
+_logger = logging.getLogger(__name__)
+
+ASSET_BACKFILL_BATCH_SIZE = 5000
 
 
 class Asset(models.Model):
     _name = 'property.asset'
     _description = 'Property Asset'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'maintenance.count.mixin',
+    ]
     _order = 'name'
 
     name = fields.Char(string='Asset Name', required=True, tracking=True)
     code = fields.Char(string='Asset Code', required=True, tracking=True)
-    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade', tracking=True)
-    building_id = fields.Many2one('property.building', string='Building', required=True, ondelete='cascade', tracking=True)
-    unit_id = fields.Many2one('property.unit', string='Unit', ondelete='cascade', tracking=True)
+    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade',
+                                  tracking=True, index=True)
+    building_id = fields.Many2one('property.building', string='Building', required=True, ondelete='cascade',
+                                  tracking=True, index=True)
+    unit_id = fields.Many2one('property.unit', string='Unit', ondelete='cascade', tracking=True, index=True)
     
     asset_type = fields.Selection([
         ('hvac', 'HVAC System'),
@@ -55,32 +65,61 @@ class Asset(models.Model):
     
     notes = fields.Text(string='Notes')
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', related='property_id.company_id', store=True)
+    company_id = fields.Many2one('res.company', string='Company', related='property_id.company_id', store=True, index=True)
     
     _sql_constraints = [
         ('code_unique', 'unique(code, company_id)', 'Asset code must be unique per company!')
     ]
     
-    @api.depends('maintenance_request_ids', 'maintenance_request_ids.completion_date')
+    @api.depends('maintenance_request_ids.completion_date', 'maintenance_request_ids.stage_id')
     def _compute_last_maintenance_date(self):
+        last_dates = self._get_last_maintenance_dates()
         for record in self:
-            completed_requests = record.maintenance_request_ids.filtered(
-                lambda r: r.completion_date and r.stage_id.done
-            )
-            if completed_requests:
-                record.last_maintenance_date = max(completed_requests.mapped('completion_date'))
-            else:
-                record.last_maintenance_date = False
+            last_date = last_dates.get(record._origin.id)
+            record.last_maintenance_date = last_date.date() if last_date else False
+    
+    def _get_last_maintenance_dates(self):
+        """Return ``{asset_id: latest completion datetime}`` of done requests,
+        aggregated for the whole recordset in one grouped query."""
+        ids = [record_id for record_id in self._origin.ids if record_id]
+        done_stage_ids = self.env['maintenance.stage']._get_done_stage_ids()
+        if not ids or not done_stage_ids:
+            return {}
+        groups = self.env['maintenance.request'].read_group([
+            ('asset_id', 'in', ids),
+            ('stage_id', 'in', done_stage_ids),
+            ('completion_date', '!=', False),
+        ], ['asset_id', 'completion_date:max'], ['asset_id'], lazy=False)
+        return {group['asset_id'][0]: group['completion_date'] for group in groups if group['asset_id']}
+    
+    @api.model
+    def cron_backfill_last_maintenance_date(self, batch_size=ASSET_BACKFILL_BATCH_SIZE):
+        """Recompute ``last_maintenance_date`` of every asset in chunks."""
+        self.env.cr.execute("SELECT id FROM property_asset ORDER BY id")
+        asset_ids = [row[0] for row in self.env.cr.fetchall()]
+        for index in range(0, len(asset_ids), batch_size):
+            assets = self.with_context(active_test=False).browse(asset_ids[index:index + batch_size])
+            last_dates = assets._get_last_maintenance_dates()
+            values_by_date = defaultdict(list)
+            for asset in assets:
+                last_date = last_dates.get(asset.id)
+                values_by_date[last_date.date() if last_date else None].append(asset.id)
+            for last_date, ids in values_by_date.items():
+                self.env.cr.execute(
+                    "UPDATE property_asset SET last_maintenance_date = %s WHERE id IN %s",
+                    (last_date, tuple(ids)),
+                )
+            assets.invalidate_cache(['last_maintenance_date'], assets.ids)
+        _logger.info('Backfilled last maintenance date of %s assets', len(asset_ids))
+        return True
     
     @api.depends('maintenance_request_ids')
     def _compute_maintenance_count(self):
-        for record in self:
-            record.maintenance_count = len(record.maintenance_request_ids)
+        self._set_relation_count('maintenance_count', 'maintenance.request', 'asset_id')
     
     @api.depends('preventive_maintenance_ids')
     def _compute_pm_count(self):
-        for record in self:
-            record.preventive_maintenance_count = len(record.preventive_maintenance_ids)
+        self._set_relation_count('preventive_maintenance_count', 'preventive.maintenance', 'asset_id')
     
     @api.onchange('unit_id')
     def _onchange_unit_id(self):
@@ -6,12 +6,15 @@ from odoo import models, fields, api
 class Building(models.Model):
     _name = 'property.building'
     _description = 'Building'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'maintenance.count.mixin',
+    ]
     _order = 'name'
 
     name = fields.Char(string='Building Name', required=True, tracking=True)
     code = fields.Char(string='Building Code', required=True, tracking=True)
-    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade', tracking=True)
+    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade',
+                                  tracking=True, index=True)
     
     floors = fields.Integer(string='Number of Floors', default=1)
     year_built = fields.Integer(string='Year Built')
@@ -23,9 +26,15 @@ class Building(models.Model):
     maintenance_request_ids = fields.One2many('maintenance.request', 'building_id', string='Maintenance Requests')
     maintenance_count = fields.Integer(string='Maintenance Count', compute='_compute_maintenance_count')
     
+    # Portfolio rollup (maintained by maintenance.portfolio.rollup)
+    open_request_count = fields.Integer(string='Open Requests', readonly=True, copy=False)
+    overdue_request_count = fields.Integer(string='Overdue Requests', readonly=True, copy=False)
+    mtd_maintenance_cost = fields.Float(string='Maintenance Cost (MTD)', readonly=True, copy=False)
+    mttr_hours = fields.Float(string='MTTR (Hours)', readonly=True, copy=False)
+    
     notes = fields.Text(string='Notes')
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', related='property_id.company_id', store=True)
+    company_id = fields.Many2one('res.company', string='Company', related='property_id.company_id', store=True, index=True)
     
     _sql_constraints = [
         ('code_unique', 'unique(code, property_id)', 'Building code must be unique per property!')
@@ -33,13 +42,11 @@ class Building(models.Model):
     
     @api.depends('unit_ids')
     def _compute_unit_count(self):
-        for record in self:
-            record.unit_count = len(record.unit_ids)
+        self._set_relation_count('unit_count', 'property.unit', 'building_id')
     
     @api.depends('maintenance_request_ids')
     def _compute_maintenance_count(self):
-        for record in self:
-            record.maintenance_count = len(record.maintenance_request_ids)
+        self._set_relation_count('maintenance_count', 'maintenance.request', 'building_id')
     
     def action_view_units(self):
         self.ensure_one()
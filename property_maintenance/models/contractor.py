@@ -1,12 +1,23 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from odoo.tools import html_escape
+from collections import defaultdict
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Days before expiry from which a contractor is flagged as expiring
+COMPLIANCE_WARNING_DAYS = 30
 
 
 class MaintenanceContractor(models.Model):
     _name = 'maintenance.contractor'
     _description = 'Maintenance Contractor'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'maintenance.count.mixin',
+    ]
     _order = 'name'
 
     name = fields.Char(string='Contractor Name', required=True, tracking=True)
@@ -31,16 +42,26 @@ class MaintenanceContractor(models.Model):
     ], string='Rating', tracking=True)
     
     license_number = fields.Char(string='License Number')
-    license_expiry = fields.Date(string='License Expiry Date')
+    license_expiry = fields.Date(string='License Expiry Date', index=True)
     insurance_number = fields.Char(string='Insurance Number')
-    insurance_expiry = fields.Date(string='Insurance Expiry Date')
+    insurance_expiry = fields.Date(string='Insurance Expiry Date', index=True)
+    
+    compliance_expiry = fields.Date(string='Compliance Expiry', compute='_compute_compliance', store=True,
+                                    index=True, help='Earliest of the license and insurance expiry dates.')
+    compliance_state = fields.Selection([
+        ('compliant', 'Compliant'),
+        ('expiring', 'Expiring Soon'),
+        ('expired', 'Expired'),
+    ], string='Compliance', compute='_compute_compliance', store=True, index=True, tracking=True)
     
     work_order_ids = fields.One2many('work.order', 'contractor_id', string='Work Orders')
     work_order_count = fields.Integer(string='Work Orders', compute='_compute_work_order_count')
     
+    scorecard_ids = fields.One2many('maintenance.contractor.scorecard', 'contractor_id', string='Scorecards')
+    
     notes = fields.Text(string='Notes')
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company, index=True)
     
     _sql_constraints = [
         ('code_unique', 'unique(code, company_id)', 'Contractor code must be unique per company!')
@@ -48,8 +69,95 @@ class MaintenanceContractor(models.Model):
     
     @api.depends('work_order_ids')
     def _compute_work_order_count(self):
-        for record in self:
-            record.work_order_count = len(record.work_order_ids)
+        self._set_relation_count('work_order_count', 'work.order', 'contractor_id')
+    
+    def write(self, vals):
+        res = super(MaintenanceContractor, self).write(vals)
+        if 'rating' in vals:
+            category_ids = set(self.scorecard_ids.category_id.ids)
+            self.env['maintenance.contractor.scorecard'].sudo()._update_scores(category_ids)
+        return res
+    
+    @api.depends('license_expiry', 'insurance_expiry')
+    def _compute_compliance(self):
+        today = fields.Date.context_today(self)
+        for contractor in self:
+            expiries = [date for date in (contractor.license_expiry, contractor.insurance_expiry) if date]
+            contractor.compliance_expiry = min(expiries) if expiries else False
+            contractor.compliance_state = contractor._get_compliance_state(today)
+    
+    def _get_compliance_state(self, today, warning_days=COMPLIANCE_WARNING_DAYS):
+        self.ensure_one()
+        if not self.compliance_expiry:
+            return 'compliant'
+        if self.compliance_expiry < today:
+            return 'expired'
+        if self.compliance_expiry <= today + timedelta(days=warning_days):
+            return 'expiring'
+        return 'compliant'
+    
+    @api.model
+    def cron_sweep_compliance(self, warning_days=COMPLIANCE_WARNING_DAYS):
+        """Move contractors crossing the expiring or expired threshold.
+        
+        The stored state only changes with the expiry dates, so time alone
+        never updates it. The indexed ``compliance_expiry`` lets one query
+        pick up exactly the contractors inside the horizon whose state is
+        stale; their managers then receive a single digest each.
+        """
+        today = fields.Date.context_today(self)
+        self.flush(['compliance_expiry', 'compliance_state'])
+        self.env.cr.execute("""
+            UPDATE maintenance_contractor
+               SET compliance_state = CASE WHEN compliance_expiry < %(today)s THEN 'expired' ELSE 'expiring' END
+             WHERE active
+               AND compliance_expiry <= %(horizon)s
+               AND compliance_state IS DISTINCT FROM
+                   CASE WHEN compliance_expiry < %(today)s THEN 'expired' ELSE 'expiring' END
+            RETURNING id
+        """, {'today': today, 'horizon': today + timedelta(days=warning_days)})
+        contractors = self.browse([row[0] for row in self.env.cr.fetchall()])
+        self.invalidate_cache(['compliance_state'], contractors.ids)
+        if contractors:
+            contractors._send_compliance_digest()
+        _logger.info('Contractor compliance sweep flagged %s contractors', len(contractors))
+        return True
+    
+    def _send_compliance_digest(self):
+        """Send each maintenance manager one mail listing the contractors of
+        ``self`` belonging to their companies."""
+        managers = self.env.ref('property_maintenance.group_maintenance_manager').users.filtered('email')
+        contractors_by_company = defaultdict(lambda: self.browse())
+        for contractor in self:
+            contractors_by_company[contractor.company_id.id] |= contractor
+        
+        mail_values = []
+        for manager in managers:
+            contractors = self.browse()
+            for company_id, company_contractors in contractors_by_company.items():
+                if not company_id or company_id in manager.company_ids.ids:
+                    contractors |= company_contractors
+            if not contractors:
+                continue
+            rows = ''.join(
+                '<tr><td>%s</td><td>%s</td><td>%s</td></tr>' % (
+                    html_escape(contractor.name),
+                    html_escape(dict(self._fields['compliance_state'].selection)[contractor.compliance_state]),
+                    contractor.compliance_expiry,
+                )
+                for contractor in contractors.sorted('compliance_expiry')
+            )
+            mail_values.append({
+                'subject': _('Contractor compliance: %s contractor(s) need attention') % len(contractors),
+                'body_html': '<p>%s</p><table><tr><th>%s</th><th>%s</th><th>%s</th></tr>%s</table>' % (
+                    _('The license or insurance of the following contractors is expiring or has expired.'),
+                    _('Contractor'), _('Compliance'), _('Expiry'), rows,
+                ),
+                'email_to': manager.email_formatted,
+                'auto_delete': True,
+            })
+        if mail_values:
+            self.env['mail.mail'].sudo().create(mail_values)
     
     @api.onchange('partner_id')
     def _onchange_partner_id(self):
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from concurrent.futures import ProcessPoolExecutor
+import io
+import logging
+import threading
+
+from PIL import Image, ImageOps
+
+_logger = logging.getLogger(__name__)
+
+DERIVATIVE_BATCH_SIZE = 50
+DERIVATIVE_MAX_WORKERS = 4
+DERIVATIVE_JPEG_QUALITY = 80
+# Longest side, in pixels, of each derivative
+DERIVATIVE_SIZES = {
+    'display': 1600,
+    'thumbnail': 256,
+}
+# ``res_field`` of the derivatives, attached to the record of their original
+DERIVATIVE_RES_FIELDS = {
+    'display': 'maintenance_display',
+    'thumbnail': 'maintenance_thumbnail',
+}
+
+
+def _render_derivatives(source, sizes=DERIVATIVE_SIZES, quality=DERIVATIVE_JPEG_QUALITY):
+    """Return ``{kind: jpeg_bytes}`` for one original image, given as a
+    filestore path or as raw bytes.
+
+    Runs in a worker process. The orientation stored in the EXIF data is
+    applied to the pixels first; the derivatives are then saved without any
+    metadata, which strips EXIF (GPS position included).
+    """
+    image = ImageOps.exif_transpose(Image.open(source if isinstance(source, str) else io.BytesIO(source)))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    derivatives = {}
+    for kind, max_side in sizes.items():
+        derivative = image.copy()
+        derivative.thumbnail((max_side, max_side), Image.LANCZOS)
+        output = io.BytesIO()
+        derivative.save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+        derivatives[kind] = output.getvalue()
+    return derivatives
+
+
+class IrAttachment(models.Model):
+    _inherit = 'ir.attachment'
+
+    maintenance_derivative_state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Derivative Status', copy=False, index=True)
+    maintenance_display_id = fields.Many2one('ir.attachment', string='Display Image', copy=False,
+                                             ondelete='set null')
+    maintenance_thumbnail_id = fields.Many2one('ir.attachment', string='Thumbnail', copy=False,
+                                               ondelete='set null')
+    maintenance_thumbnail_image = fields.Binary(string='Thumbnail Image',
+                                                compute='_compute_maintenance_thumbnail_image')
+
+    def init(self):
+        super(IrAttachment, self).init()
+        # Derivatives used to hang off their original, readable by anyone
+        # allowed to read attachments: move them onto the original's record
+        for kind, res_field in DERIVATIVE_RES_FIELDS.items():
+            self.env.cr.execute("""
+                UPDATE ir_attachment d
+                   SET res_model = o.res_model, res_id = o.res_id, res_field = %s
+                  FROM ir_attachment o
+                 WHERE d.id = o.maintenance_%s_id
+                   AND d.res_model = 'ir.attachment' AND d.res_id = o.id
+            """, [res_field, kind])
+
+    @api.depends('maintenance_thumbnail_id')
+    def _compute_maintenance_thumbnail_image(self):
+        """Serve the thumbnail through its original, whose access is
+        checked on the route: the derivative itself is a field attachment,
+        which only system users may read directly."""
+        for attachment in self:
+            attachment.maintenance_thumbnail_image = attachment.maintenance_thumbnail_id.sudo().datas
+
+    @api.model
+    def _queue_maintenance_derivatives(self, attachment_ids):
+        """Flag the original images among ``attachment_ids`` for the
+        derivative worker; already processed ones are left alone."""
+        if not attachment_ids:
+            return
+        self.flush(['mimetype', 'maintenance_derivative_state'])
+        self.env.cr.execute("""
+            UPDATE ir_attachment
+               SET maintenance_derivative_state = 'pending'
+             WHERE id IN %s
+               AND mimetype LIKE 'image/%%'
+               AND mimetype != 'image/svg+xml'
+               AND maintenance_derivative_state IS NULL
+        """, [tuple(attachment_ids)])
+        self.invalidate_cache(['maintenance_derivative_state'], list(attachment_ids))
+
+    def _get_maintenance_display(self):
+        """Return the attachment to show instead of ``self`` in lists,
+        portal pages and reports."""
+        self.ensure_one()
+        return self.maintenance_display_id or self
+
+    def _get_maintenance_thumbnail(self):
+        self.ensure_one()
+        return self.maintenance_thumbnail_id or self.maintenance_display_id or self
+
+    @api.model
+    def cron_generate_maintenance_derivatives(self, batch_size=DERIVATIVE_BATCH_SIZE,
+                                              max_workers=DERIVATIVE_MAX_WORKERS):
+        """Render the pending maintenance photos in a process pool.
+
+        Batches are claimed with ``SKIP LOCKED`` so several crons may run at
+        once; the resizing itself happens in separate processes, away from
+        the HTTP workers and the Python GIL.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                self.env.cr.execute("""
+                    SELECT id FROM ir_attachment
+                     WHERE maintenance_derivative_state = 'pending'
+                     ORDER BY id
+                     LIMIT %s
+                       FOR UPDATE SKIP LOCKED
+                """, [batch_size])
+                attachments = self.browse([row[0] for row in self.env.cr.fetchall()])
+                if not attachments:
+                    break
+                # Workers read filestore originals themselves, keeping them out of this process
+                futures = {
+                    attachment.id: executor.submit(
+                        _render_derivatives,
+                        self._full_path(attachment.store_fname) if attachment.store_fname else attachment.raw,
+                    )
+                    for attachment in attachments
+                }
+                for attachment in attachments:
+                    try:
+                        derivatives = futures[attachment.id].result()
+                    except Exception:
+                        _logger.warning('Could not render derivatives of attachment %s', attachment.id, exc_info=True)
+                        attachment.maintenance_derivative_state = 'failed'
+                        continue
+                    attachment._store_maintenance_derivatives(derivatives)
+                if auto_commit:
+                    self.env.cr.commit()
+                else:
+                    break
+        return True
+
+    def _store_maintenance_derivatives(self, derivatives):
+        self.ensure_one()
+        basename = (self.name or 'photo').rsplit('.', 1)[0]
+        vals_list = [{
+            'name': '%s-%s.jpg' % (basename, kind),
+            'raw': derivatives[kind],
+            'mimetype': 'image/jpeg',
+            # Attached to the record of the original, with its access rules;
+            # the field keeps them out of the record's chatter and attachments
+            'res_model': self.res_model,
+            'res_id': self.res_id,
+            'res_field': DERIVATIVE_RES_FIELDS[kind],
+            'company_id': self.company_id.id,
+        } for kind in ('display', 'thumbnail')]
+        display, thumbnail = self.create(vals_list)
+        # Tokens for the portal page only, see portal_my_maintenance_request
+        (display | thumbnail).generate_access_token()
+        self.write({
+            'maintenance_display_id': display.id,
+            'maintenance_thumbnail_id': thumbnail.id,
+            'maintenance_derivative_state': 'done',
+        })
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+
+
+class IrSequence(models.Model):
+    _inherit = 'ir.sequence'
+
+    @api.model
+    def _next_block_by_code(self, sequence_code, count):
+        """Reserve ``count`` numbers of the sequence ``sequence_code`` at once.
+        
+        Standard sequences draw the whole block with a single ``nextval``
+        query; no-gap sequences lock their row once and advance
+        ``number_next`` by the block size. Sequences using date ranges fall
+        back to one ``_next()`` call per number.
+        
+        :return: list of ``count`` formatted names (``False`` when no
+                 sequence matches, like ``next_by_code``)
+        """
+        if count <= 0:
+            return []
+        self.check_access_rights('read')
+        company_id = self.env.company.id
+        sequence = self.search([
+            ('code', '=', sequence_code),
+            ('company_id', 'in', [company_id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
+        if sequence.use_date_range:
+            return [sequence._next() for _index in range(count)]
+        
+        if sequence.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ['ir_sequence_%03d' % sequence.id, count],
+            )
+            numbers = sorted(row[0] for row in self.env.cr.fetchall())
+        else:
+            self.env.cr.execute(
+                "SELECT number_next FROM ir_sequence WHERE id = %s FOR UPDATE NOWAIT",
+                [sequence.id],
+            )
+            first_number = self.env.cr.fetchone()[0]
+            self.env.cr.execute(
+                "UPDATE ir_sequence SET number_next = number_next + %s WHERE id = %s",
+                [sequence.number_increment * count, sequence.id],
+            )
+            sequence.invalidate_cache(['number_next'], [sequence.id])
+            numbers = [first_number + index * sequence.number_increment for index in range(count)]
+        return [sequence.get_next_char(number) for number in numbers]
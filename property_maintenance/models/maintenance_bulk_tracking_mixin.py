@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.tools import html_escape
+from collections import defaultdict
+
+# Context key enabling the bulk tracking mode, with the mode as value:
+# 'record' logs one summary message per record, 'batch' one audit entry per batch
+BULK_TRACKING_CONTEXT_KEY = 'maintenance_bulk_tracking'
+
+
+class MaintenanceBulkTrackingMixin(models.AbstractModel):
+    """Summarized field tracking for imports and mass updates.
+
+    Must come before ``mail.thread`` in ``_inherit`` so that its
+    ``message_track`` runs first. Under the bulk context key, tracked changes
+    are still computed in memory but are not stored as one message plus one
+    ``mail.tracking.value`` row per field and record; they are summarized
+    instead. Subtype notifications (e.g. stage changes) are not sent in bulk
+    mode.
+
+    Tracking is finalized once per model and transaction, with the context
+    of the first tracked write. The mode of each write is therefore recorded
+    per record when the write is prepared; a record written at least once
+    without the bulk mode in the transaction is tracked as usual.
+    """
+    _name = 'maintenance.bulk.tracking.mixin'
+    _description = 'Bulk Tracking Mode'
+
+    def with_bulk_tracking(self, mode='record'):
+        """Return ``self`` in bulk tracking mode, e.g.
+        ``requests.with_bulk_tracking().write(vals)`` or
+        ``env['work.order'].with_bulk_tracking('batch').load(fields, rows)``."""
+        if mode not in ('record', 'batch'):
+            raise ValueError('Unknown bulk tracking mode: %s' % mode)
+        context = {BULK_TRACKING_CONTEXT_KEY: mode, 'mail_create_nosubscribe': True}
+        if mode == 'batch':
+            # Creations are audited per batch too, see create()
+            context['mail_create_nolog'] = True
+        return self.with_context(**context)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super(MaintenanceBulkTrackingMixin, self).create(vals_list)
+        if records and self._context.get(BULK_TRACKING_CONTEXT_KEY) == 'batch':
+            self.env['maintenance.bulk.operation'].sudo()._log_creation(records)
+        return records
+
+    def _get_bulk_tracking_modes(self):
+        """Return the ``{record_id: mode}`` of the writes of this model
+        prepared in the current transaction, ``None`` meaning regular."""
+        return self.env.cr.precommit.data.setdefault('maintenance.bulk.tracking.%s' % self._name, {})
+
+    def _track_prepare(self, fields_iter):
+        fnames = set(fields_iter)
+        if not self._get_tracked_fields().intersection(fnames):
+            return super(MaintenanceBulkTrackingMixin, self)._track_prepare(fnames)
+        mode = self._context.get(BULK_TRACKING_CONTEXT_KEY) or None
+        modes = self._get_bulk_tracking_modes()
+        for record_id in self.ids:
+            if mode is None:
+                # Regular writes keep their full tracking
+                modes[record_id] = None
+            else:
+                modes.setdefault(record_id, mode)
+        return super(MaintenanceBulkTrackingMixin, self)._track_prepare(fnames)
+
+    def message_track(self, tracked_fields, initial_values):
+        if not tracked_fields:
+            return super(MaintenanceBulkTrackingMixin, self).message_track(tracked_fields, initial_values)
+        # Records not prepared by a write (direct calls) follow the context
+        default_mode = self._context.get(BULK_TRACKING_CONTEXT_KEY) or None
+        modes = self._get_bulk_tracking_modes()
+        ids_by_mode = defaultdict(list)
+        for record_id in self.ids:
+            ids_by_mode[modes.pop(record_id, default_mode)].append(record_id)
+
+        tracking = {}
+        regular = self.browse(ids_by_mode.pop(None, []))
+        if regular:
+            tracking.update(super(MaintenanceBulkTrackingMixin, regular).message_track(
+                tracked_fields, initial_values))
+        for mode, record_ids in ids_by_mode.items():
+            tracking.update(self.browse(record_ids)._message_track_bulk(mode, tracked_fields, initial_values))
+        return tracking
+
+    def _message_track_bulk(self, mode, tracked_fields, initial_values):
+        """Summarize the tracked changes of ``self`` according to ``mode``."""
+        tracked_fields = self.fields_get(tracked_fields)
+        changes_by_record = {}
+        for record in self.exists():
+            initial = initial_values.get(record.id)
+            if not initial:
+                continue
+            changes = record._get_bulk_tracking_changes(tracked_fields, initial)
+            if changes:
+                changes_by_record[record.id] = changes
+
+        if mode == 'batch':
+            self.env['maintenance.bulk.operation'].sudo()._log_batch(self._name, changes_by_record)
+        else:
+            bodies = {
+                record_id: '<ul>%s</ul>' % ''.join(
+                    '<li>%s: %s &#8594; %s</li>' % tuple(html_escape(value) for value in change)
+                    for change in changes
+                )
+                for record_id, changes in changes_by_record.items()
+            }
+            self.browse(list(bodies))._message_log_batch(bodies)
+        return {record_id: (set(), []) for record_id in changes_by_record}
+
+    def _get_bulk_tracking_changes(self, tracked_fields, initial):
+        """Return ``[(field label, old value, new value)]`` for the tracked
+        fields of ``self`` that changed, as display strings."""
+        self.ensure_one()
+        changes = []
+        for fname, description in tracked_fields.items():
+            if fname not in initial:
+                continue
+            field = self._fields[fname]
+            old_value, new_value = initial[fname], self[fname]
+            if field.type in ('many2one', 'many2many', 'one2many'):
+                if old_value == new_value:
+                    continue
+            elif (old_value or False) == (new_value or False):
+                continue
+            changes.append((
+                description['string'],
+                self._get_bulk_tracking_display(field, old_value),
+                self._get_bulk_tracking_display(field, new_value),
+            ))
+        return changes
+
+    def _get_bulk_tracking_display(self, field, value):
+        if field.type == 'selection':
+            return dict(field._description_selection(self.env)).get(value) or ''
+        return field.convert_to_display_name(value, self) or ''
+
+
+class MaintenanceBulkOperation(models.Model):
+    _name = 'maintenance.bulk.operation'
+    _description = 'Maintenance Bulk Operation Audit'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(string='Operation', required=True, readonly=True)
+    res_model = fields.Char(string='Model', required=True, readonly=True, index=True)
+    record_count = fields.Integer(string='Records', readonly=True)
+    user_id = fields.Many2one('res.users', string='User', readonly=True, default=lambda self: self.env.user)
+    details = fields.Text(string='Changes', readonly=True)
+
+    @api.model
+    def _log_creation(self, records):
+        """Store one audit entry for the records created in a bulk batch."""
+        return self.create({
+            'name': _('Bulk creation of %s %s') % (len(records), records._description),
+            'res_model': records._name,
+            'record_count': len(records),
+            'details': '\n'.join(name for record_id, name in records.name_get()),
+        })
+
+    @api.model
+    def _log_batch(self, model_name, changes_by_record):
+        """Store one audit entry for all the changes of a bulk batch."""
+        if not changes_by_record:
+            return self.browse()
+        records = self.env[model_name].browse(list(changes_by_record))
+        names = dict(records.name_get())
+        lines = [
+            '%s: %s: %s -> %s' % ((names.get(record_id, record_id),) + change)
+            for record_id, changes in changes_by_record.items()
+            for change in changes
+        ]
+        return self.create({
+            'name': _('Bulk update of %s %s') % (len(changes_by_record), self.env[model_name]._description),
+            'res_model': model_name,
+            'record_count': len(changes_by_record),
+            'details': '\n'.join(lines),
+        })
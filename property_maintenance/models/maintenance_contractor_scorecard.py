@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+SCORECARD_QUEUE_KEY = 'property_maintenance.scorecard_keys'
+SCORECARD_BATCH_SIZE = 1000
+
+# Work order fields deciding in which scorecard a completed work order counts
+SCORECARD_TRIGGER_FIELDS = {
+    'contractor_id', 'category_id', 'state', 'start_date', 'end_date', 'scheduled_date', 'active',
+}
+
+# Contractors with fewer completed jobs in a category get a neutral on-time rate
+SCORECARD_MIN_VOLUME = 5
+
+
+class MaintenanceContractorScorecard(models.Model):
+    _name = 'maintenance.contractor.scorecard'
+    _description = 'Contractor Scorecard'
+    _order = 'category_id, score desc'
+    _rec_name = 'contractor_id'
+
+    contractor_id = fields.Many2one('maintenance.contractor', string='Contractor', required=True, readonly=True,
+                                    ondelete='cascade')
+    category_id = fields.Many2one('maintenance.category', string='Category', required=True, readonly=True,
+                                  index=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+
+    completed_count = fields.Integer(string='Completed Jobs', readonly=True, group_operator='sum')
+    on_time_count = fields.Integer(string='On-Time Jobs', readonly=True, group_operator='sum')
+    total_cost = fields.Float(string='Total Cost', readonly=True, group_operator='sum')
+    total_hours = fields.Float(string='Total Hours', readonly=True, group_operator='sum')
+    avg_cost = fields.Float(string='Average Cost', readonly=True, group_operator='avg')
+    avg_duration = fields.Float(string='Average Duration (Hours)', readonly=True, group_operator='avg')
+    on_time_rate = fields.Float(string='On-Time Rate (%)', readonly=True, group_operator='avg')
+    last_completion_date = fields.Datetime(string='Last Completed', readonly=True)
+    score = fields.Float(string='Score', readonly=True, group_operator='avg')
+
+    _sql_constraints = [
+        ('contractor_category_uniq', 'unique(contractor_id, category_id)',
+         'Only one scorecard per contractor and category is allowed!')
+    ]
+
+    @api.model
+    def _queue_refresh(self, keys):
+        """Schedule the refresh of the ``(contractor_id, category_id)``
+        scorecards in ``keys`` for the end of the transaction."""
+        keys = {(contractor_id, category_id) for contractor_id, category_id in keys if contractor_id and category_id}
+        if not keys:
+            return
+        queue = self.env.cr.precommit.data.get(SCORECARD_QUEUE_KEY)
+        if queue is None:
+            queue = self.env.cr.precommit.data[SCORECARD_QUEUE_KEY] = set()
+            self.env.cr.precommit.add(self.sudo()._process_refresh_queue)
+        queue.update(keys)
+
+    def _process_refresh_queue(self):
+        keys = self.env.cr.precommit.data.pop(SCORECARD_QUEUE_KEY, set())
+        if keys:
+            self._refresh_scorecards(list(keys))
+
+    @api.model
+    def _refresh_scorecards(self, keys):
+        """Recompute the scorecards of the ``(contractor_id, category_id)``
+        pairs in ``keys`` from their completed work orders.
+
+        A job is on time when its maintenance request met its SLA, or, for
+        work orders without request, when it finished on its scheduled day.
+        The score blends on-time rate (50%), contractor rating (20%) and
+        cost relative to the cheapest contractor of the category (30%).
+        """
+        if not keys:
+            return
+        self.env['work.order'].flush(list(SCORECARD_TRIGGER_FIELDS) + ['total_cost', 'duration_hours',
+                                                                       'maintenance_request_id'])
+        self.env['maintenance.request'].flush(['sla_status'])
+        self.env['maintenance.contractor'].flush(['rating', 'company_id'])
+
+        params = {
+            'contractor_ids': [contractor_id for contractor_id, category_id in keys],
+            'category_ids': [category_id for contractor_id, category_id in keys],
+            'min_volume': SCORECARD_MIN_VOLUME,
+            'uid': self.env.uid,
+        }
+        self.env.cr.execute("""
+            DELETE FROM maintenance_contractor_scorecard s
+             USING unnest(%(contractor_ids)s::int[], %(category_ids)s::int[]) AS k(contractor_id, category_id)
+             WHERE s.contractor_id = k.contractor_id AND s.category_id = k.category_id
+        """, params)
+        self.env.cr.execute("""
+            INSERT INTO maintenance_contractor_scorecard
+                   (contractor_id, category_id, company_id, completed_count, on_time_count, total_cost,
+                    total_hours, avg_cost, avg_duration, on_time_rate, last_completion_date,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT agg.contractor_id, agg.category_id, c.company_id, agg.completed_count, agg.on_time_count,
+                   agg.total_cost, agg.total_hours,
+                   agg.total_cost / agg.completed_count, agg.total_hours / agg.completed_count,
+                   CASE WHEN agg.completed_count >= %(min_volume)s
+                        THEN 100.0 * agg.on_time_count / agg.completed_count ELSE 50.0 END,
+                   agg.last_completion_date,
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM (
+                    SELECT wo.contractor_id, wo.category_id,
+                           COUNT(*) AS completed_count,
+                           COUNT(*) FILTER (WHERE COALESCE(r.sla_status = 'on_time',
+                                                           wo.end_date::date <= wo.scheduled_date::date))
+                               AS on_time_count,
+                           SUM(COALESCE(wo.total_cost, 0)) AS total_cost,
+                           SUM(COALESCE(wo.duration_hours, 0)) AS total_hours,
+                           MAX(wo.end_date) AS last_completion_date
+                      FROM work_order wo
+                      JOIN unnest(%(contractor_ids)s::int[], %(category_ids)s::int[]) AS k(contractor_id, category_id)
+                        ON k.contractor_id = wo.contractor_id AND k.category_id = wo.category_id
+                      LEFT JOIN maintenance_request r ON r.id = wo.maintenance_request_id
+                     WHERE wo.active AND wo.state = 'completed'
+                     GROUP BY wo.contractor_id, wo.category_id
+                   ) agg
+              JOIN maintenance_contractor c ON c.id = agg.contractor_id
+        """, params)
+        self._update_scores(set(params['category_ids']))
+        self.invalidate_cache()
+
+    @api.model
+    def _update_scores(self, category_ids):
+        """Rescore every scorecard of ``category_ids``; the cost component is
+        relative to the category, so one refresh moves its neighbours."""
+        if not category_ids:
+            return
+        self.env['maintenance.contractor'].flush(['rating'])
+        self.flush(['contractor_id', 'category_id', 'on_time_rate', 'avg_cost'])
+        self.env.cr.execute("""
+            UPDATE maintenance_contractor_scorecard s
+               SET score = 0.5 * s.on_time_rate / 100.0
+                         + 0.2 * COALESCE(NULLIF(c.rating, '')::int, 3) / 5.0
+                         + 0.3 * CASE WHEN s.avg_cost > 0 THEN LEAST(m.min_cost / s.avg_cost, 1.0) ELSE 1.0 END
+              FROM maintenance_contractor c,
+                   (SELECT category_id, MIN(avg_cost) FILTER (WHERE avg_cost > 0) AS min_cost
+                      FROM maintenance_contractor_scorecard
+                     WHERE category_id IN %s
+                     GROUP BY category_id) m
+             WHERE c.id = s.contractor_id AND m.category_id = s.category_id
+        """, [tuple(category_ids)])
+        self.invalidate_cache(['score'])
+
+    @api.model
+    def cron_rebuild_scorecards(self, batch_size=SCORECARD_BATCH_SIZE):
+        """Rebuild every scorecard in chunks. Backfills the table after
+        installation and picks up late SLA status or rating changes."""
+        self.env['work.order'].flush(['contractor_id', 'category_id', 'state'])
+        self.env.cr.execute("""
+            SELECT DISTINCT contractor_id, category_id
+              FROM work_order
+             WHERE contractor_id IS NOT NULL AND state = 'completed'
+             UNION
+            SELECT contractor_id, category_id FROM maintenance_contractor_scorecard
+        """)
+        keys = self.env.cr.fetchall()
+        for index in range(0, len(keys), batch_size):
+            self._refresh_scorecards(keys[index:index + batch_size])
+        _logger.info('Contractor scorecards rebuilt for %s contractor/category pairs', len(keys))
+        return True
+
+    @api.model
+    def _rank_contractors(self, category_id, company_id=False, limit=None):
+        """Return the compliant contractors offering ``category_id``, best
+        first.
+
+        Contractors without history in the category rank after those with
+        one, ordered by their rating.
+        """
+        if not category_id:
+            return self.env['maintenance.contractor']
+        domain = [('category_ids', 'in', category_id), ('compliance_state', '!=', 'expired')]
+        if company_id:
+            domain += [('company_id', 'in', [company_id, False])]
+        contractors = self.env['maintenance.contractor'].search(domain)
+        scores = {
+            scorecard['contractor_id']: scorecard['score']
+            for scorecard in self.search_read([
+                ('category_id', '=', category_id),
+                ('contractor_id', 'in', contractors.ids),
+            ], ['contractor_id', 'score'], load=None)
+        }
+        ranked = contractors.sorted(lambda contractor: (
+            contractor.id not in scores,
+            -scores.get(contractor.id, 0.0),
+            -int(contractor.rating or 0),
+            contractor.name,
+        ))
+        return ranked[:limit] if limit else ranked
@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api
+from collections import defaultdict
+import logging
+import psycopg2
+import threading
+
+_logger = logging.getLogger(__name__)
+
+VENDOR_BILL_BATCH_SIZE = 200
 
 
 class MaintenanceCostLine(models.Model):
@@ -8,7 +16,7 @@ class MaintenanceCostLine(models.Model):
     _description = 'Maintenance Cost Line'
     _order = 'create_date'
 
-    work_order_id = fields.Many2one('work.order', string='Work Order', required=True, ondelete='cascade')
+    work_order_id = fields.Many2one('work.order', string='Work Order', required=True, ondelete='cascade', index=True)
     
     cost_type = fields.Selection([
         ('labor', 'Labor'),
@@ -32,11 +40,184 @@ class MaintenanceCostLine(models.Model):
     # For Contractor
     contractor_id = fields.Many2one('maintenance.contractor', string='Contractor')
     
+    vendor_bill_id = fields.Many2one('account.move', string='Vendor Bill', readonly=True, copy=False, index=True,
+                                     ondelete='set null')
+    
     # Common
     subtotal = fields.Float(string='Subtotal', compute='_compute_subtotal', store=True)
     
     notes = fields.Text(string='Notes')
-    company_id = fields.Many2one('res.company', string='Company', related='work_order_id.company_id', store=True)
+    company_id = fields.Many2one('res.company', string='Company', related='work_order_id.company_id', store=True, index=True)
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super(MaintenanceCostLine, self).create(vals_list)
+        self.env['maintenance.portfolio.rollup']._queue_refresh(lines.work_order_id.building_id.ids)
+        self.env['maintenance.cost.cube']._mark_work_orders_dirty(lines.work_order_id)
+        self.env['maintenance.contractor.scorecard']._queue_refresh(lines.work_order_id._get_scorecard_keys())
+        return lines
+    
+    def write(self, vals):
+        if set(vals) == {'vendor_bill_id'}:
+            # Billing links do not change any amount
+            return super(MaintenanceCostLine, self).write(vals)
+        work_orders = self.work_order_id
+        res = super(MaintenanceCostLine, self).write(vals)
+        work_orders |= self.work_order_id
+        self.env['maintenance.portfolio.rollup']._queue_refresh(work_orders.building_id.ids)
+        self.env['maintenance.cost.cube']._mark_work_orders_dirty(work_orders)
+        self.env['maintenance.contractor.scorecard']._queue_refresh(work_orders._get_scorecard_keys())
+        return res
+    
+    def unlink(self):
+        work_orders = self.work_order_id
+        building_ids = work_orders.building_id.ids
+        self.env['maintenance.cost.cube']._mark_work_orders_dirty(work_orders)
+        scorecard_keys = work_orders._get_scorecard_keys()
+        res = super(MaintenanceCostLine, self).unlink()
+        self.env['maintenance.portfolio.rollup']._queue_refresh(building_ids)
+        self.env['maintenance.contractor.scorecard']._queue_refresh(scorecard_keys)
+        return res
+    
+    @api.model
+    def _aggregate_costs(self, work_order_ids, domain=None):
+        """Sum line subtotals per work order and cost type in one grouped query.
+        
+        :return: ``{work_order_id: {cost_type: amount}}``; work orders
+                 without lines are absent
+        """
+        if not work_order_ids:
+            return {}
+        groups = self.read_group(
+            [('work_order_id', 'in', list(work_order_ids))] + (domain or []),
+            ['work_order_id', 'cost_type', 'subtotal'],
+            ['work_order_id', 'cost_type'],
+            lazy=False,
+        )
+        totals = defaultdict(dict)
+        for group in groups:
+            totals[group['work_order_id'][0]][group['cost_type']] = group['subtotal'] or 0.0
+        return dict(totals)
+    
+    @api.model
+    def cron_generate_vendor_bills(self, period='month', batch_size=VENDOR_BILL_BATCH_SIZE):
+        """Bill the unbilled contractor cost lines of completed work orders,
+        one vendor bill per contractor partner, company and closed period.
+        
+        Groups are claimed ``batch_size`` at a time and their lines marked
+        with their bill before the chunk is committed, so the job is safe to
+        rerun or to run concurrently: billed lines are never picked up again.
+        Only periods that already ended are billed, so a rerun within a
+        period never splits it over several bills.
+        """
+        if period not in ('week', 'month'):
+            raise ValueError('Unsupported vendor bill period: %s' % period)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        after_key = None
+        group_count = bill_count = 0
+        while True:
+            try:
+                line_ids_by_key = self._claim_vendor_bill_lines(period, batch_size, after_key)
+            except psycopg2.extensions.TransactionRollbackError:
+                # A line was billed by a concurrent run after our snapshot
+                if not auto_commit:
+                    raise
+                self.env.cr.rollback()
+                continue
+            if not line_ids_by_key:
+                break
+            after_key = list(line_ids_by_key)[-1]
+            groups = [(key, self.browse(line_ids)) for key, line_ids in line_ids_by_key.items() if line_ids]
+            bills = self._create_vendor_bills(groups)
+            group_count += len(groups)
+            bill_count += len(bills)
+            if auto_commit:
+                # Commits the bills and releases the lines of this chunk
+                self.env.cr.commit()
+        _logger.info('Vendor bills: %s bills created for %s contractor/period groups', bill_count, group_count)
+        return True
+    
+    @api.model
+    def _claim_vendor_bill_lines(self, period, limit, after_key=None):
+        """Lock and return the unbilled lines of the next ``limit``
+        ``(partner_id, company_id, period_start)`` groups after ``after_key``.
+        
+        Lines are locked with ``FOR UPDATE SKIP LOCKED``: lines locked by a
+        concurrent run are left to it, and the lock is held until the caller
+        commits, by which time the lines are billed.
+        
+        :return: ``{key: line_ids}`` in key order; a group whose lines are
+            all locked elsewhere maps to an empty list
+        """
+        self.flush(['cost_type', 'vendor_bill_id', 'contractor_id', 'work_order_id'])
+        self.env['work.order'].flush(['state', 'end_date', 'contractor_id', 'company_id'])
+        self.env['maintenance.contractor'].flush(['partner_id'])
+        key = """COALESCE(lc.partner_id, wc.partner_id), COALESCE(wo.company_id, %(company_id)s),
+                 date_trunc(%(period)s, COALESCE(wo.end_date, l.create_date))::date"""
+        from_where = """
+              FROM maintenance_cost_line l
+              JOIN work_order wo ON wo.id = l.work_order_id
+              LEFT JOIN maintenance_contractor lc ON lc.id = l.contractor_id
+              LEFT JOIN maintenance_contractor wc ON wc.id = wo.contractor_id
+             WHERE l.cost_type = 'contractor'
+               AND l.vendor_bill_id IS NULL
+               AND wo.state = 'completed'
+               AND COALESCE(lc.partner_id, wc.partner_id) IS NOT NULL
+               AND COALESCE(wo.end_date, l.create_date) < date_trunc(%(period)s, NOW() AT TIME ZONE 'UTC')
+        """
+        params = {'period': period, 'company_id': self.env.company.id, 'limit': limit, 'after_key': after_key}
+        if after_key:
+            from_where += " AND (%s) > %%(after_key)s" % key
+        self.env.cr.execute("SELECT DISTINCT %s %s ORDER BY 1, 2, 3 LIMIT %%(limit)s" % (key, from_where), params)
+        keys = self.env.cr.fetchall()
+        if not keys:
+            return {}
+        # Lock the lines of exactly these groups, the next ones are left for the next chunk
+        params['last_key'] = keys[-1]
+        self.env.cr.execute("""
+            SELECT l.id, %s %s AND (%s) <= %%(last_key)s
+             ORDER BY 2, 3, 4, l.id
+               FOR UPDATE OF l SKIP LOCKED
+        """ % (key, from_where, key), params)
+        line_ids_by_key = {group_key: [] for group_key in keys}
+        for line_id, partner_id, company_id, period_start in self.env.cr.fetchall():
+            line_ids_by_key[partner_id, company_id, period_start].append(line_id)
+        return line_ids_by_key
+    
+    @api.model
+    def _create_vendor_bills(self, groups):
+        """Create one vendor bill per ``((partner_id, company_id,
+        period_start), lines)`` group, in one multi-create per company, and
+        mark the lines as billed."""
+        groups_by_company = defaultdict(list)
+        for group_key, lines in groups:
+            groups_by_company[group_key[1]].append((group_key, lines))
+        bills = self.env['account.move']
+        for company_id, company_groups in groups_by_company.items():
+            vals_list = []
+            for (partner_id, company_id, period_start), lines in company_groups:
+                work_orders = lines.work_order_id
+                vals_list.append({
+                    'move_type': 'in_invoice',
+                    'partner_id': partner_id,
+                    'company_id': company_id,
+                    'invoice_date': fields.Date.today(),
+                    'ref': '%s %s' % (period_start.strftime('%Y-%m-%d'),
+                                      ', '.join(work_orders.mapped('name')))[:200],
+                    'invoice_origin': ', '.join(work_orders.mapped('name'))[:1000],
+                    'work_order_id': work_orders.id if len(work_orders) == 1 else False,
+                    'invoice_line_ids': [(0, 0, {
+                        'name': f'{line.work_order_id.name} - {line.description}',
+                        'quantity': line.quantity,
+                        'price_unit': line.unit_price,
+                    }) for line in lines],
+                })
+            # The default purchase journal must belong to the bill's company
+            company_bills = self.env['account.move'].with_company(company_id).create(vals_list)
+            for (key, lines), bill in zip(company_groups, company_bills):
+                lines.write({'vendor_bill_id': bill.id})
+            bills |= company_bills
+        return bills
     
     @api.depends('cost_type', 'hours', 'hourly_rate', 'quantity', 'unit_price')
     def _compute_subtotal(self):
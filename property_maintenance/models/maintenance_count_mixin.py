@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+
+class MaintenanceCountMixin(models.AbstractModel):
+    _name = 'maintenance.count.mixin'
+    _description = 'Grouped Relation Counters'
+
+    def _get_relation_counts(self, model_name, field_name, domain=None):
+        """Count the ``model_name`` records linked to ``self`` through ``field_name``.
+        
+        A single grouped query is issued for the whole recordset instead of
+        loading every related record to take its ``len()``.
+        
+        :return: dict ``{record_id: count}`` (records without links are absent)
+        """
+        ids = [record_id for record_id in self._origin.ids if record_id]
+        if not ids:
+            return {}
+        groups = self.env[model_name].read_group(
+            [(field_name, 'in', ids)] + (domain or []),
+            [field_name],
+            [field_name],
+            lazy=False,
+        )
+        return {group[field_name][0]: group['__count'] for group in groups if group[field_name]}
+    
+    def _set_relation_count(self, count_field, model_name, field_name, domain=None):
+        """Assign ``count_field`` on every record of ``self`` from one grouped query."""
+        counts = self._get_relation_counts(model_name, field_name, domain)
+        for record in self:
+            record[count_field] = counts.get(record._origin.id, 0)
+    
+    def _set_many2many_count(self, count_field, field_name):
+        """Assign ``count_field`` from one grouped query on the relation
+        table of the many2many ``field_name``."""
+        field = self._fields[field_name]
+        ids = [record_id for record_id in self._origin.ids if record_id]
+        counts = {}
+        if ids:
+            self.flush([field_name])
+            self.env.cr.execute("""
+                SELECT {column1}, COUNT(*) FROM {relation} WHERE {column1} IN %s GROUP BY {column1}
+            """.format(column1=field.column1, relation=field.relation), [tuple(ids)])
+            counts = dict(self.env.cr.fetchall())
+        for record in self:
+            record[count_field] = counts.get(record._origin.id, 0)
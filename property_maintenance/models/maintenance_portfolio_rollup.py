@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+ROLLUP_QUEUE_KEY = 'property_maintenance.rollup_building_ids'
+ROLLUP_BATCH_SIZE = 500
+
+
+class MaintenancePortfolioRollup(models.Model):
+    _name = 'maintenance.portfolio.rollup'
+    _description = 'Maintenance Portfolio Rollup'
+    _order = 'property_id, building_id'
+    _rec_name = 'building_id'
+
+    building_id = fields.Many2one('property.building', string='Building', required=True, readonly=True,
+                                  ondelete='cascade')
+    property_id = fields.Many2one('property.property', string='Property', readonly=True, index=True,
+                                  ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+
+    month_start = fields.Date(string='Month', readonly=True)
+    open_count = fields.Integer(string='Open Requests', readonly=True, group_operator='sum')
+    overdue_count = fields.Integer(string='Overdue Requests', readonly=True, group_operator='sum')
+    repaired_count = fields.Integer(string='Repaired Requests', readonly=True, group_operator='sum')
+    repair_hours = fields.Float(string='Repair Hours', readonly=True, group_operator='sum')
+    mttr_hours = fields.Float(string='MTTR (Hours)', readonly=True, group_operator='avg')
+    mtd_cost = fields.Float(string='Cost (MTD)', readonly=True, group_operator='sum')
+
+    _sql_constraints = [
+        ('building_uniq', 'unique(building_id)', 'Only one rollup row per building is allowed!')
+    ]
+
+    @api.model
+    def _queue_refresh(self, building_ids):
+        """Schedule the rollup of ``building_ids`` for the end of the transaction.
+
+        Buildings are accumulated in the cursor's precommit data so that a
+        bulk operation refreshes each affected building once.
+        """
+        building_ids = {building_id for building_id in building_ids if building_id}
+        if not building_ids:
+            return
+        queue = self.env.cr.precommit.data.get(ROLLUP_QUEUE_KEY)
+        if queue is None:
+            queue = self.env.cr.precommit.data[ROLLUP_QUEUE_KEY] = set()
+            self.env.cr.precommit.add(self.sudo()._process_refresh_queue)
+        queue.update(building_ids)
+
+    def _process_refresh_queue(self):
+        building_ids = self.env.cr.precommit.data.pop(ROLLUP_QUEUE_KEY, set())
+        if building_ids:
+            self._refresh_buildings(list(building_ids))
+
+    @api.model
+    def _refresh_buildings(self, building_ids):
+        """Recompute the rollup rows of ``building_ids`` and push them to the
+        stored portfolio fields of their buildings and properties."""
+        if not building_ids:
+            return
+        self.env['maintenance.request'].flush(['building_id', 'stage_id', 'sla_status', 'request_date',
+                                               'completion_date', 'active'])
+        self.env['work.order'].flush(['building_id', 'state', 'end_date', 'total_cost', 'active'])
+        self.env['property.building'].flush(['property_id', 'company_id'])
+
+        params = {
+            'building_ids': tuple(building_ids),
+            'month_start': fields.Date.today().replace(day=1),
+            'uid': self.env.uid,
+        }
+        self.env.cr.execute("""
+            INSERT INTO maintenance_portfolio_rollup
+                   (building_id, property_id, company_id, month_start, open_count, overdue_count,
+                    repaired_count, repair_hours, mttr_hours, mtd_cost,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT b.id, b.property_id, b.company_id, %(month_start)s,
+                   COALESCE(req.open_count, 0), COALESCE(req.overdue_count, 0),
+                   COALESCE(req.repaired_count, 0), COALESCE(req.repair_hours, 0),
+                   CASE WHEN req.repaired_count > 0 THEN req.repair_hours / req.repaired_count ELSE 0 END,
+                   COALESCE(wo.mtd_cost, 0),
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM property_building b
+              LEFT JOIN (
+                    SELECT r.building_id,
+                           COUNT(*) FILTER (WHERE NOT COALESCE(s.done, FALSE)
+                                              AND NOT COALESCE(s.cancelled, FALSE)) AS open_count,
+                           COUNT(*) FILTER (WHERE NOT COALESCE(s.done, FALSE)
+                                              AND NOT COALESCE(s.cancelled, FALSE)
+                                              AND r.sla_status = 'overdue') AS overdue_count,
+                           COUNT(*) FILTER (WHERE s.done AND r.completion_date IS NOT NULL) AS repaired_count,
+                           SUM(EXTRACT(EPOCH FROM r.completion_date - r.request_date) / 3600.0)
+                               FILTER (WHERE s.done AND r.completion_date IS NOT NULL) AS repair_hours
+                      FROM maintenance_request r
+                      LEFT JOIN maintenance_stage s ON s.id = r.stage_id
+                     WHERE r.active AND r.building_id IN %(building_ids)s
+                     GROUP BY r.building_id
+                   ) req ON req.building_id = b.id
+              LEFT JOIN (
+                    SELECT building_id, SUM(total_cost) AS mtd_cost
+                      FROM work_order
+                     WHERE active AND state = 'completed' AND end_date >= %(month_start)s
+                       AND building_id IN %(building_ids)s
+                     GROUP BY building_id
+                   ) wo ON wo.building_id = b.id
+             WHERE b.id IN %(building_ids)s
+            ON CONFLICT (building_id) DO UPDATE SET
+                   property_id = EXCLUDED.property_id,
+                   company_id = EXCLUDED.company_id,
+                   month_start = EXCLUDED.month_start,
+                   open_count = EXCLUDED.open_count,
+                   overdue_count = EXCLUDED.overdue_count,
+                   repaired_count = EXCLUDED.repaired_count,
+                   repair_hours = EXCLUDED.repair_hours,
+                   mttr_hours = EXCLUDED.mttr_hours,
+                   mtd_cost = EXCLUDED.mtd_cost,
+                   write_uid = EXCLUDED.write_uid,
+                   write_date = EXCLUDED.write_date
+            RETURNING property_id
+        """, params)
+        property_ids = tuple({row[0] for row in self.env.cr.fetchall() if row[0]})
+
+        self.env.cr.execute("""
+            UPDATE property_building b
+               SET open_request_count = r.open_count,
+                   overdue_request_count = r.overdue_count,
+                   mtd_maintenance_cost = r.mtd_cost,
+                   mttr_hours = r.mttr_hours
+              FROM maintenance_portfolio_rollup r
+             WHERE r.building_id = b.id AND b.id IN %(building_ids)s
+        """, params)
+        if property_ids:
+            self.env.cr.execute("""
+                UPDATE property_property p
+                   SET open_request_count = agg.open_count,
+                       overdue_request_count = agg.overdue_count,
+                       mtd_maintenance_cost = agg.mtd_cost,
+                       mttr_hours = agg.mttr_hours
+                  FROM (
+                        SELECT pp.id,
+                               COALESCE(SUM(r.open_count), 0) AS open_count,
+                               COALESCE(SUM(r.overdue_count), 0) AS overdue_count,
+                               COALESCE(SUM(r.mtd_cost), 0) AS mtd_cost,
+                               CASE WHEN SUM(r.repaired_count) > 0
+                                    THEN SUM(r.repair_hours) / SUM(r.repaired_count) ELSE 0 END AS mttr_hours
+                          FROM property_property pp
+                          LEFT JOIN maintenance_portfolio_rollup r ON r.property_id = pp.id
+                         WHERE pp.id IN %(property_ids)s
+                         GROUP BY pp.id
+                       ) agg
+                 WHERE agg.id = p.id
+            """, {'property_ids': property_ids})
+
+        portfolio_fields = ['open_request_count', 'overdue_request_count', 'mtd_maintenance_cost', 'mttr_hours']
+        self.env['property.building'].invalidate_cache(portfolio_fields, list(building_ids))
+        self.env['property.property'].invalidate_cache(portfolio_fields, list(property_ids))
+        self.invalidate_cache()
+
+    @api.model
+    def cron_reconcile_portfolio_rollup(self, batch_size=ROLLUP_BATCH_SIZE):
+        """Rebuild the rollup of every building in chunks.
+
+        Catches drifts the incremental updates cannot see (stage flag
+        changes, direct SQL edits) and resets the month-to-date cost when a
+        new month starts.
+        """
+        self.env.cr.execute("SELECT id FROM property_building ORDER BY id")
+        building_ids = [row[0] for row in self.env.cr.fetchall()]
+        for index in range(0, len(building_ids), batch_size):
+            self._refresh_buildings(building_ids[index:index + batch_size])
+        _logger.info('Portfolio rollup reconciled for %s buildings', len(building_ids))
+        return True
@@ -1,27 +1,61 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import UserError
 from datetime import datetime, timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Share of the SLA window after which an open request turns to 'warning'
+SLA_WARNING_RATIO = 0.8
+SLA_SWEEP_BATCH_SIZE = 1000
+TRANSITION_BATCH_SIZE = 1000
+
+# Stage codes reachable from each stage code through the request lifecycle
+STAGE_TRANSITIONS = {
+    'new': ('submitted', 'cancelled'),
+    'submitted': ('approved', 'cancelled'),
+    'approved': ('in_progress', 'cancelled'),
+    'in_progress': ('on_hold', 'completed', 'cancelled'),
+    'on_hold': ('in_progress', 'cancelled'),
+    'completed': ('closed',),
+    'closed': (),
+    'cancelled': (),
+}
+# Stage codes of requests still waiting to be completed, see the partial SLA index in init()
+OPEN_REQUEST_STATES = ('new', 'submitted', 'approved', 'in_progress', 'on_hold')
+
+# Request fields feeding the portal counters of their tenant and owner
+PORTAL_COUNTER_TRIGGER_FIELDS = {'tenant_id', 'owner_id', 'stage_id', 'active'}
+
+# Request fields feeding the portfolio rollup of their building
+ROLLUP_TRIGGER_FIELDS = {
+    'building_id', 'stage_id', 'priority', 'request_date', 'completion_date', 'sla_status', 'active',
+}
 
 
 class MaintenanceRequest(models.Model):
     _name = 'maintenance.request'
     _description = 'Maintenance Request'
-    _inherit = ['mail.thread', 'mail.activity.mixin', 'portal.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'portal.mixin',
+        'maintenance.count.mixin',
+    ]
     _order = 'priority desc, create_date desc'
 
     name = fields.Char(string='Request Number', required=True, readonly=True, copy=False, default='New')
     title = fields.Char(string='Request Title', required=True, tracking=True)
     description = fields.Html(string='Description', required=True)
     
-    property_id = fields.Many2one('property.property', string='Property', required=True, tracking=True)
-    building_id = fields.Many2one('property.building', string='Building', required=True, tracking=True)
-    unit_id = fields.Many2one('property.unit', string='Unit', tracking=True)
-    asset_id = fields.Many2one('property.asset', string='Asset', tracking=True)
+    property_id = fields.Many2one('property.property', string='Property', required=True, tracking=True, index=True)
+    building_id = fields.Many2one('property.building', string='Building', required=True, tracking=True, index=True)
+    unit_id = fields.Many2one('property.unit', string='Unit', tracking=True, index=True)
+    asset_id = fields.Many2one('property.asset', string='Asset', tracking=True, index=True)
     
     category_id = fields.Many2one('maintenance.category', string='Category', required=True, tracking=True)
-    stage_id = fields.Many2one('maintenance.stage', string='Stage', required=True, tracking=True, group_expand='_read_group_stage_ids')
+    stage_id = fields.Many2one('maintenance.stage', string='Stage', required=True, tracking=True, group_expand='_read_group_stage_ids',
+                               default=lambda self: self.env['maintenance.stage']._get_stage_by_code('new'), index=True)
     
     priority = fields.Selection([
         ('0', 'Low'),
@@ -38,27 +72,32 @@ class MaintenanceRequest(models.Model):
     
     requested_by = fields.Many2one('res.users', string='Requested By', default=lambda self: self.env.user, tracking=True)
     requester_partner_id = fields.Many2one('res.partner', string='Requester (Partner)', tracking=True)
-    tenant_id = fields.Many2one('res.partner', string='Tenant', domain=[('is_tenant', '=', True)], tracking=True)
-    owner_id = fields.Many2one('res.partner', string='Owner', domain=[('is_property_owner', '=', True)], tracking=True)
+    tenant_id = fields.Many2one('res.partner', string='Tenant', domain=[('is_tenant', '=', True)], tracking=True,
+                                index=True)
+    owner_id = fields.Many2one('res.partner', string='Owner', domain=[('is_property_owner', '=', True)], tracking=True,
+                               index=True)
     
     team_id = fields.Many2one('maintenance.team', string='Maintenance Team', tracking=True)
     assigned_to = fields.Many2one('res.users', string='Assigned To', tracking=True)
     
     request_date = fields.Datetime(string='Request Date', default=fields.Datetime.now, required=True, tracking=True)
-    scheduled_date = fields.Datetime(string='Scheduled Date', tracking=True)
+    scheduled_date = fields.Datetime(string='Scheduled Date', tracking=True, index=True)
     completion_date = fields.Datetime(string='Completion Date', readonly=True, tracking=True)
     
     # SLA
     sla_hours = fields.Float(string='SLA (Hours)', compute='_compute_sla_hours', store=True)
-    sla_deadline = fields.Datetime(string='SLA Deadline', compute='_compute_sla_deadline', store=True)
+    sla_deadline = fields.Datetime(string='SLA Deadline', compute='_compute_sla_deadline', store=True, index=True)
     sla_status = fields.Selection([
         ('on_time', 'On Time'),
         ('warning', 'Warning'),
         ('overdue', 'Overdue'),
     ], string='SLA Status', compute='_compute_sla_status', store=True)
+    sla_threshold_date = fields.Datetime(string='Next SLA Threshold', compute='_compute_sla_status', store=True,
+                                         index=True, copy=False,
+                                         help='Moment at which the SLA status of an open request changes next')
     
     # Work Order
-    work_order_id = fields.Many2one('work.order', string='Work Order', readonly=True, tracking=True)
+    work_order_id = fields.Many2one('work.order', string='Work Order', readonly=True, tracking=True, index=True)
     work_order_count = fields.Integer(string='Work Orders', compute='_compute_work_order_count')
     
     # Attachments
@@ -87,13 +126,57 @@ class MaintenanceRequest(models.Model):
     
     color = fields.Integer(string='Color Index')
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
-    
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('maintenance.request') or 'New'
-        return super(MaintenanceRequest, self).create(vals)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company, index=True)
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Reserve all missing numbers in one sequence round-trip
+        to_number = [vals for vals in vals_list if vals.get('name', 'New') == 'New']
+        names = self.env['ir.sequence']._next_block_by_code('maintenance.request', len(to_number))
+        for vals, name in zip(to_number, names):
+            vals['name'] = name or 'New'
+        requests = super(MaintenanceRequest, self).create(vals_list)
+        self.env['maintenance.portfolio.rollup']._queue_refresh(requests.building_id.ids)
+        self.env['res.partner']._queue_maintenance_counter_refresh(requests._get_portal_partner_ids())
+        self.env['ir.attachment']._queue_maintenance_derivatives(requests.attachment_ids.ids)
+        return requests
+    
+    def write(self, vals):
+        rollup_building_ids = self.building_id.ids if ROLLUP_TRIGGER_FIELDS & set(vals) else []
+        counter_partner_ids = self._get_portal_partner_ids() if PORTAL_COUNTER_TRIGGER_FIELDS & set(vals) else None
+        res = super(MaintenanceRequest, self).write(vals)
+        if rollup_building_ids:
+            self.env['maintenance.portfolio.rollup']._queue_refresh(rollup_building_ids + self.building_id.ids)
+        if counter_partner_ids is not None:
+            self.env['res.partner']._queue_maintenance_counter_refresh(
+                counter_partner_ids | self._get_portal_partner_ids())
+        if 'attachment_ids' in vals:
+            self.env['ir.attachment']._queue_maintenance_derivatives(self.attachment_ids.ids)
+        return res
+    
+    def unlink(self):
+        rollup_building_ids = self.building_id.ids
+        counter_partner_ids = self._get_portal_partner_ids()
+        res = super(MaintenanceRequest, self).unlink()
+        self.env['maintenance.portfolio.rollup']._queue_refresh(rollup_building_ids)
+        self.env['res.partner']._queue_maintenance_counter_refresh(counter_partner_ids)
+        return res
+    
+    def init(self):
+        # Portal lists seek on (create_date, id) within a tenant's or owner's requests
+        tools.create_index(self.env.cr, 'maintenance_request_tenant_create_date_idx', self._table,
+                           ['tenant_id', 'create_date DESC', 'id DESC'])
+        tools.create_index(self.env.cr, 'maintenance_request_owner_create_date_idx', self._table,
+                           ['owner_id', 'create_date DESC', 'id DESC'])
+        # Open requests by SLA deadline, without the bulk of completed history
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS maintenance_request_open_sla_deadline_idx
+                ON maintenance_request (sla_deadline)
+             WHERE active AND state IN %s
+        """, [OPEN_REQUEST_STATES])
+    
+    def _get_portal_partner_ids(self):
+        return set(self.tenant_id.ids) | set(self.owner_id.ids)
     
     @api.depends('category_id', 'priority')
     def _compute_sla_hours(self):
@@ -115,26 +198,73 @@ class MaintenanceRequest(models.Model):
             else:
                 record.sla_deadline = False
     
-    @api.depends('sla_deadline', 'completion_date', 'stage_id.done')
+    @api.depends('sla_deadline', 'sla_hours', 'completion_date', 'stage_id.done', 'stage_id.cancelled')
     def _compute_sla_status(self):
         now = fields.Datetime.now()
         for record in self:
+            record.sla_threshold_date = False
             if record.stage_id.done:
                 if record.completion_date and record.sla_deadline:
                     record.sla_status = 'on_time' if record.completion_date <= record.sla_deadline else 'overdue'
                 else:
                     record.sla_status = 'on_time'
             elif record.sla_deadline:
-                hours_remaining = (record.sla_deadline - now).total_seconds() / 3600
-                if hours_remaining < 0:
+                warning_date = record._get_sla_warning_date()
+                if record.sla_deadline <= now:
                     record.sla_status = 'overdue'
-                elif hours_remaining < record.sla_hours * 0.2:  # Less than 20% time remaining
+                elif warning_date <= now:
                     record.sla_status = 'warning'
+                    record.sla_threshold_date = record.sla_deadline
                 else:
                     record.sla_status = 'on_time'
+                    record.sla_threshold_date = warning_date
+                # Cancelled requests keep their last status and are never swept
+                if record.stage_id.cancelled:
+                    record.sla_threshold_date = False
             else:
                 record.sla_status = 'on_time'
     
+    def _get_sla_warning_date(self):
+        self.ensure_one()
+        return self.sla_deadline - timedelta(hours=self.sla_hours * (1 - SLA_WARNING_RATIO))
+    
+    @api.model
+    def cron_update_sla_status(self, batch_size=SLA_SWEEP_BATCH_SIZE):
+        """Move open requests whose warning or deadline threshold has passed.
+        
+        Only rows with ``sla_threshold_date <= now`` are touched, which the
+        index on that column resolves without scanning the whole table.
+        """
+        now = fields.Datetime.now()
+        self.flush(['sla_status', 'sla_threshold_date'])
+        self.env.cr.execute("""
+            SELECT id FROM maintenance_request
+             WHERE sla_threshold_date <= %s
+             ORDER BY sla_threshold_date
+        """, (now,))
+        ids = [row[0] for row in self.env.cr.fetchall()]
+        for index in range(0, len(ids), batch_size):
+            self.browse(ids[index:index + batch_size])._sla_sweep_batch(now)
+        if ids:
+            _logger.info('SLA sweep updated %s maintenance requests', len(ids))
+        return True
+    
+    def _sla_sweep_batch(self, now):
+        """Apply the threshold crossings of ``self`` in one UPDATE."""
+        if not self:
+            return
+        self.env.cr.execute("""
+            UPDATE maintenance_request
+               SET sla_status = CASE WHEN sla_deadline <= %(now)s THEN 'overdue' ELSE 'warning' END,
+                   sla_threshold_date = CASE WHEN sla_deadline <= %(now)s THEN NULL ELSE sla_deadline END
+             WHERE id IN %(ids)s
+               AND sla_threshold_date <= %(now)s
+         RETURNING building_id
+        """, {'now': now, 'ids': tuple(self.ids)})
+        building_ids = {row[0] for row in self.env.cr.fetchall()}
+        self.invalidate_cache(['sla_status', 'sla_threshold_date'], self.ids)
+        self.env['maintenance.portfolio.rollup']._queue_refresh(building_ids)
+    
     @api.depends('work_order_id')
     def _compute_work_order_count(self):
         for record in self:
@@ -142,8 +272,7 @@ class MaintenanceRequest(models.Model):
     
     @api.depends('attachment_ids')
     def _compute_attachment_count(self):
-        for record in self:
-            record.attachment_count = len(record.attachment_ids)
+        self._set_many2many_count('attachment_count', 'attachment_ids')
     
     @api.depends('work_order_id.total_cost')
     def _compute_actual_cost(self):
@@ -172,51 +301,77 @@ class MaintenanceRequest(models.Model):
             if self.asset_id.category_id:
                 self.category_id = self.asset_id.category_id
     
+    def _set_stage(self, code, body, extra_vals=None):
+        """Move ``self`` to the stage ``code`` and post ``body`` on every
+        record, notifying its followers; see ``action_bulk_transition`` for
+        large sets."""
+        stage = self.env['maintenance.stage']._get_stage_by_code(code)
+        if stage:
+            self.write(dict(extra_vals or {}, stage_id=stage.id))
+            for record in self:
+                record.message_post(body=body)
+        return stage
+    
     def action_submit(self):
-        submitted_stage = self.env['maintenance.stage'].search([('code', '=', 'submitted')], limit=1)
-        if submitted_stage:
-            self.write({'stage_id': submitted_stage.id})
-            self.message_post(body=_('Request submitted for approval'))
+        self._set_stage('submitted', _('Request submitted for approval'))
         return True
     
     def action_approve(self):
-        approved_stage = self.env['maintenance.stage'].search([('code', '=', 'approved')], limit=1)
-        if approved_stage:
-            self.write({'stage_id': approved_stage.id})
-            self.message_post(body=_('Request approved'))
+        self._set_stage('approved', _('Request approved'))
         return True
     
     def action_start(self):
-        in_progress_stage = self.env['maintenance.stage'].search([('code', '=', 'in_progress')], limit=1)
-        if in_progress_stage:
-            self.write({'stage_id': in_progress_stage.id})
-            self.message_post(body=_('Request started'))
+        self._set_stage('in_progress', _('Request started'))
         return True
     
     def action_complete(self):
-        completed_stage = self.env['maintenance.stage'].search([('code', '=', 'completed')], limit=1)
-        if completed_stage:
-            self.write({
-                'stage_id': completed_stage.id,
-                'completion_date': fields.Datetime.now()
-            })
-            self.message_post(body=_('Request completed'))
+        self._set_stage('completed', _('Request completed'), {'completion_date': fields.Datetime.now()})
         return True
     
     def action_close(self):
-        closed_stage = self.env['maintenance.stage'].search([('code', '=', 'closed')], limit=1)
-        if closed_stage:
-            self.write({'stage_id': closed_stage.id})
-            self.message_post(body=_('Request closed'))
+        self._set_stage('closed', _('Request closed'))
         return True
     
     def action_cancel(self):
-        cancelled_stage = self.env['maintenance.stage'].search([('code', '=', 'cancelled')], limit=1)
-        if cancelled_stage:
-            self.write({'stage_id': cancelled_stage.id})
-            self.message_post(body=_('Request cancelled'))
+        self._set_stage('cancelled', _('Request cancelled'))
         return True
     
+    def action_bulk_transition(self, code, batch_size=TRANSITION_BATCH_SIZE):
+        """Move a large set of requests to the stage ``code``.
+        
+        Transitions are validated in memory against ``STAGE_TRANSITIONS``;
+        requests that cannot reach ``code`` from their current stage are
+        skipped. Each chunk is written with a single UPDATE without field
+        tracking, and its audit messages are inserted in one batch.
+        
+        :return: dict with the number of ``moved`` and ``skipped`` requests
+        """
+        stage_registry = self.env['maintenance.stage']._get_stage_registry()
+        if code not in stage_registry:
+            raise UserError(_('No maintenance stage is configured for code "%s".') % code)
+        code_by_stage_id = {entry[0]: stage_code for stage_code, entry in stage_registry.items()}
+        stage = self.env['maintenance.stage'].browse(stage_registry[code][0])
+        
+        movable_ids = [
+            row['id'] for row in self.read(['stage_id'], load=None)
+            if code in STAGE_TRANSITIONS.get(code_by_stage_id.get(row['stage_id']), ())
+        ]
+        
+        vals = {'stage_id': stage.id}
+        if code == 'completed':
+            vals['completion_date'] = fields.Datetime.now()
+        body = _('Stage changed to %s (bulk update)') % stage.name
+        
+        requests = self.browse(movable_ids).with_context(tracking_disable=True)
+        for index in range(0, len(requests), batch_size):
+            chunk = requests[index:index + batch_size]
+            chunk.write(vals)
+            chunk._message_log_batch({record_id: body for record_id in chunk.ids})
+            chunk.flush()
+            chunk.invalidate_cache(ids=chunk.ids)
+        
+        return {'moved': len(movable_ids), 'skipped': len(self) - len(movable_ids)}
+    
     def action_convert_to_work_order(self):
         self.ensure_one()
         if self.work_order_id:
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, tools
 
 
 class MaintenanceStage(models.Model):
@@ -27,3 +27,49 @@ class MaintenanceStage(models.Model):
     _sql_constraints = [
         ('code_unique', 'unique(code)', 'Stage code must be unique!')
     ]
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        stages = super(MaintenanceStage, self).create(vals_list)
+        self.clear_caches()
+        return stages
+    
+    def write(self, vals):
+        res = super(MaintenanceStage, self).write(vals)
+        if {'code', 'done', 'cancelled'} & set(vals):
+            self.clear_caches()
+        return res
+    
+    def unlink(self):
+        res = super(MaintenanceStage, self).unlink()
+        self.clear_caches()
+        return res
+    
+    @api.model
+    @tools.ormcache()
+    def _get_stage_registry(self):
+        """Return ``{code: (id, done, cancelled)}`` for all stages.
+        
+        Cached per registry; create/write/unlink clear the registry caches,
+        which also signals the other workers to drop their copy.
+        """
+        self.flush(['code', 'done', 'cancelled'])
+        self.env.cr.execute("SELECT code, id, done, cancelled FROM maintenance_stage")
+        return {
+            code: (stage_id, bool(done), bool(cancelled))
+            for code, stage_id, done, cancelled in self.env.cr.fetchall()
+        }
+    
+    @api.model
+    def _get_stage_by_code(self, code):
+        """Return the stage with the given code, or an empty recordset."""
+        entry = self._get_stage_registry().get(code)
+        return self.browse(entry[0] if entry else [])
+    
+    @api.model
+    def _get_done_stage_ids(self):
+        return [entry[0] for entry in self._get_stage_registry().values() if entry[1]]
+    
+    @api.model
+    def _get_cancelled_stage_ids(self):
+        return [entry[0] for entry in self._get_stage_registry().values() if entry[2]]
@@ -1,12 +1,15 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api
+from datetime import timedelta
 
 
 class MaintenanceTeam(models.Model):
     _name = 'maintenance.team'
     _description = 'Maintenance Team'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'maintenance.count.mixin',
+    ]
     _order = 'name'
 
     name = fields.Char(string='Team Name', required=True, tracking=True)
@@ -23,8 +26,11 @@ class MaintenanceTeam(models.Model):
     category_ids = fields.Many2many('maintenance.category', 'team_category_rel', 
                                     'team_id', 'category_id', string='Specializations')
     
+    week_scheduled_hours = fields.Float(string='Scheduled This Week', compute='_compute_week_workload')
+    week_utilization = fields.Float(string='Utilization This Week (%)', compute='_compute_week_workload')
+    
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company, index=True)
     
     _sql_constraints = [
         ('code_unique', 'unique(code, company_id)', 'Team code must be unique per company!')
@@ -32,5 +38,22 @@ class MaintenanceTeam(models.Model):
     
     @api.depends('technician_ids')
     def _compute_technician_count(self):
-        for record in self:
-            record.technician_count = len(record.technician_ids)
+        self._set_relation_count('technician_count', 'maintenance.technician', 'team_id')
+    
+    def _compute_week_workload(self):
+        today = fields.Date.context_today(self)
+        groups = self.env['maintenance.technician.workload'].read_group([
+            ('team_id', 'in', self.ids),
+            ('day', '>=', today),
+            ('day', '<', today + timedelta(days=7)),
+        ], ['team_id', 'scheduled_hours:sum'], ['team_id'], lazy=False)
+        hours = {group['team_id'][0]: group['scheduled_hours'] for group in groups}
+        capacities = {
+            group['team_id'][0]: group['daily_capacity_hours']
+            for group in self.env['maintenance.technician'].read_group(
+                [('team_id', 'in', self.ids)], ['team_id', 'daily_capacity_hours:sum'], ['team_id'], lazy=False)
+        }
+        for team in self:
+            team.week_scheduled_hours = hours.get(team.id, 0.0)
+            capacity = capacities.get(team.id, 0.0) * 7
+            team.week_utilization = 100.0 * team.week_scheduled_hours / capacity if capacity else 0.0
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+WORKLOAD_QUEUE_KEY = 'property_maintenance.workload_keys'
+WORKLOAD_BATCH_SIZE = 5000
+
+# Work order fields deciding which (technician, day) buckets it counts in
+WORKLOAD_TRIGGER_FIELDS = {
+    'technician_ids', 'scheduled_date', 'estimated_duration', 'start_date', 'end_date', 'state', 'active',
+}
+
+
+class MaintenanceTechnicianWorkload(models.Model):
+    _name = 'maintenance.technician.workload'
+    _description = 'Technician Daily Workload'
+    _order = 'day, technician_id'
+    _rec_name = 'technician_id'
+
+    technician_id = fields.Many2one('maintenance.technician', string='Technician', required=True, readonly=True,
+                                    ondelete='cascade')
+    team_id = fields.Many2one('maintenance.team', string='Team', readonly=True, index=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    day = fields.Date(string='Day', required=True, readonly=True, index=True)
+
+    scheduled_hours = fields.Float(string='Scheduled Hours', readonly=True, group_operator='sum')
+    actual_hours = fields.Float(string='Actual Hours', readonly=True, group_operator='sum')
+    open_count = fields.Integer(string='Open Work Orders', readonly=True, group_operator='sum')
+    work_order_count = fields.Integer(string='Work Orders', readonly=True, group_operator='sum')
+    capacity_hours = fields.Float(string='Capacity (Hours)', readonly=True, group_operator='sum')
+    utilization = fields.Float(string='Utilization (%)', readonly=True, group_operator='avg')
+    overloaded = fields.Boolean(string='Overloaded', readonly=True)
+
+    _sql_constraints = [
+        ('technician_day_uniq', 'unique(technician_id, day)', 'Only one workload row per technician and day!')
+    ]
+
+    @api.model
+    def _queue_refresh(self, keys):
+        """Schedule the refresh of the ``(technician_id, day)`` buckets in
+        ``keys`` for the end of the transaction, once per bucket."""
+        keys = {(technician_id, day) for technician_id, day in keys if technician_id and day}
+        if not keys:
+            return
+        queue = self.env.cr.precommit.data.get(WORKLOAD_QUEUE_KEY)
+        if queue is None:
+            queue = self.env.cr.precommit.data[WORKLOAD_QUEUE_KEY] = set()
+            self.env.cr.precommit.add(self.sudo()._process_refresh_queue)
+        queue.update(keys)
+
+    def _process_refresh_queue(self):
+        keys = self.env.cr.precommit.data.pop(WORKLOAD_QUEUE_KEY, set())
+        if keys:
+            self._refresh_buckets(list(keys))
+
+    @api.model
+    def _refresh_buckets(self, keys):
+        """Rebuild the workload rows of the ``(technician_id, day)`` pairs in
+        ``keys``; buckets left without work orders are removed."""
+        if not keys:
+            return
+        self.env['work.order'].flush(list(WORKLOAD_TRIGGER_FIELDS) + ['duration_hours'])
+        self.env['maintenance.technician'].flush(['team_id', 'company_id', 'daily_capacity_hours'])
+
+        params = {
+            'technician_ids': [technician_id for technician_id, day in keys],
+            'days': [day for technician_id, day in keys],
+            'uid': self.env.uid,
+        }
+        self.env.cr.execute("""
+            DELETE FROM maintenance_technician_workload w
+             USING unnest(%(technician_ids)s::int[], %(days)s::date[]) AS k(technician_id, day)
+             WHERE w.technician_id = k.technician_id AND w.day = k.day
+        """, params)
+        self.env.cr.execute("""
+            INSERT INTO maintenance_technician_workload
+                   (technician_id, team_id, company_id, day, scheduled_hours, actual_hours, open_count,
+                    work_order_count, capacity_hours, utilization, overloaded,
+                    create_uid, create_date, write_uid, write_date)
+            SELECT agg.technician_id, t.team_id, t.company_id, agg.day,
+                   agg.scheduled_hours, agg.actual_hours, agg.open_count, agg.work_order_count,
+                   t.daily_capacity_hours,
+                   CASE WHEN t.daily_capacity_hours > 0
+                        THEN 100.0 * agg.scheduled_hours / t.daily_capacity_hours ELSE 0 END,
+                   agg.scheduled_hours > COALESCE(t.daily_capacity_hours, 0),
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM (
+                    SELECT rel.technician_id, wo.scheduled_date::date AS day,
+                           SUM(COALESCE(wo.estimated_duration, 0))
+                               FILTER (WHERE wo.state != 'cancelled') AS scheduled_hours,
+                           SUM(COALESCE(wo.duration_hours, 0)) AS actual_hours,
+                           COUNT(*) FILTER (WHERE wo.state NOT IN ('completed', 'cancelled')) AS open_count,
+                           COUNT(*) AS work_order_count
+                      FROM work_order_technician_rel rel
+                      JOIN work_order wo ON wo.id = rel.work_order_id
+                      JOIN unnest(%(technician_ids)s::int[], %(days)s::date[]) AS k(technician_id, day)
+                        ON k.technician_id = rel.technician_id AND k.day = wo.scheduled_date::date
+                     WHERE wo.active
+                     GROUP BY rel.technician_id, wo.scheduled_date::date
+                   ) agg
+              JOIN maintenance_technician t ON t.id = agg.technician_id
+        """, params)
+        self.invalidate_cache()
+
+    @api.model
+    def _refresh_technician_capacity(self, technician_ids):
+        """Propagate team, company and capacity changes of technicians to
+        their existing buckets."""
+        if not technician_ids:
+            return
+        self.env['maintenance.technician'].flush(['team_id', 'company_id', 'daily_capacity_hours'])
+        self.env.cr.execute("""
+            UPDATE maintenance_technician_workload w
+               SET team_id = t.team_id,
+                   company_id = t.company_id,
+                   capacity_hours = t.daily_capacity_hours,
+                   utilization = CASE WHEN t.daily_capacity_hours > 0
+                                      THEN 100.0 * w.scheduled_hours / t.daily_capacity_hours ELSE 0 END,
+                   overloaded = w.scheduled_hours > COALESCE(t.daily_capacity_hours, 0)
+              FROM maintenance_technician t
+             WHERE t.id = w.technician_id AND t.id IN %s
+        """, [tuple(technician_ids)])
+        self.invalidate_cache()
+
+    @api.model
+    def cron_reconcile_workload(self, days_back=30, days_ahead=90, batch_size=WORKLOAD_BATCH_SIZE):
+        """Rebuild every bucket of the rolling window around today.
+
+        Backfills the table after installation and catches changes the
+        incremental updates cannot see, such as direct SQL edits.
+        """
+        today = fields.Date.today()
+        date_from, date_to = today - timedelta(days=days_back), today + timedelta(days=days_ahead)
+        self.env['work.order'].flush(['technician_ids', 'scheduled_date'])
+        self.env.cr.execute("""
+            SELECT technician_id, day FROM maintenance_technician_workload WHERE day BETWEEN %s AND %s
+             UNION
+            SELECT DISTINCT rel.technician_id, wo.scheduled_date::date
+              FROM work_order_technician_rel rel
+              JOIN work_order wo ON wo.id = rel.work_order_id
+             WHERE wo.scheduled_date::date BETWEEN %s AND %s
+        """, [date_from, date_to, date_from, date_to])
+        keys = self.env.cr.fetchall()
+        for index in range(0, len(keys), batch_size):
+            self._refresh_buckets(keys[index:index + batch_size])
+        _logger.info('Technician workload reconciled for %s buckets', len(keys))
+        return True
+
+    @api.model
+    def get_heatmap(self, date_from, date_to, team_id=False, technician_ids=None):
+        """Return the utilization matrix of the technicians over a date range.
+
+        :return: ``{'days': [date, ...], 'rows': [{'technician_id', 'name',
+                 'team_id', 'cells': [utilization, ...], 'overloaded_days'}]}``
+                 where missing buckets count as zero utilization
+        """
+        date_from, date_to = fields.Date.to_date(date_from), fields.Date.to_date(date_to)
+        technician_domain = [('team_id', '=', team_id)] if team_id else []
+        if technician_ids is not None:
+            technician_domain.append(('id', 'in', technician_ids))
+        technicians = self.env['maintenance.technician'].search(technician_domain)
+        days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+        day_index = {day: index for index, day in enumerate(days)}
+
+        rows = {
+            technician.id: {
+                'technician_id': technician.id,
+                'name': technician.name,
+                'team_id': technician.team_id.id,
+                'cells': [0.0] * len(days),
+                'overloaded_days': 0,
+            }
+            for technician in technicians
+        }
+        buckets = self.search_read([
+            ('technician_id', 'in', technicians.ids),
+            ('day', '>=', date_from),
+            ('day', '<=', date_to),
+        ], ['technician_id', 'day', 'utilization', 'overloaded'], load=None)
+        for bucket in buckets:
+            row = rows[bucket['technician_id']]
+            row['cells'][day_index[bucket['day']]] = round(bucket['utilization'], 1)
+            row['overloaded_days'] += bucket['overloaded']
+        return {
+            'days': [fields.Date.to_string(day) for day in days],
+            'rows': sorted(rows.values(), key=lambda row: (-row['overloaded_days'], row['name'])),
+        }
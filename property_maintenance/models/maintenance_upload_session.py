@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import config
+from datetime import timedelta
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+
+_logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+UPLOAD_STREAM_BLOCK_SIZE = 64 * 1024
+# Sizes are stored in integer columns, like ir.attachment.file_size
+UPLOAD_MAX_SIZE = 2 ** 31 - 1
+UPLOAD_SESSION_TTL_HOURS = 24
+
+# Records photos and videos may be uploaded to, with their attachment field
+UPLOAD_TARGETS = {
+    'maintenance.request': 'attachment_ids',
+    'work.order': 'attachment_ids',
+}
+
+
+class MaintenanceUploadSession(models.Model):
+    _name = 'maintenance.upload.session'
+    _description = 'Maintenance Attachment Upload Session'
+    _order = 'create_date desc'
+
+    token = fields.Char(string='Token', required=True, readonly=True, copy=False, index=True,
+                        default=lambda self: uuid.uuid4().hex)
+    name = fields.Char(string='File Name', required=True)
+    mimetype = fields.Char(string='MIME Type')
+    res_model = fields.Selection([
+        ('maintenance.request', 'Maintenance Request'),
+        ('work.order', 'Work Order'),
+    ], string='Document Model', required=True)
+    res_id = fields.Integer(string='Document ID', required=True)
+    total_size = fields.Integer(string='Size (Bytes)', required=True)
+    received_size = fields.Integer(string='Received (Bytes)', default=0, readonly=True)
+    checksum = fields.Char(string='Expected SHA-1', help='Optional checksum announced by the client.')
+    state = fields.Selection([
+        ('uploading', 'Uploading'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='uploading', required=True, index=True)
+    attachment_id = fields.Many2one('ir.attachment', string='Attachment', readonly=True, ondelete='set null')
+    user_id = fields.Many2one('res.users', string='Uploaded By', default=lambda self: self.env.user, readonly=True)
+
+    _sql_constraints = [
+        ('token_uniq', 'unique(token)', 'Upload session tokens must be unique!'),
+        ('total_size_positive', 'CHECK(total_size > 0)', 'An upload must not be empty!'),
+    ]
+
+    def _get_temp_path(self):
+        """Return the partial file of the session, kept under the data
+        directory so that it can be renamed into the filestore."""
+        self.ensure_one()
+        directory = os.path.join(config['data_dir'], 'maintenance_uploads', self.env.cr.dbname)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, '%s.part' % self.token)
+
+    @api.model
+    def _start(self, res_model, res_id, name, total_size, mimetype=None, checksum=None):
+        if res_model not in UPLOAD_TARGETS:
+            raise UserError(_('Uploads are not supported on %s.') % res_model)
+        if not 0 < int(total_size) <= UPLOAD_MAX_SIZE:
+            raise UserError(_('Uploads must be between 1 byte and %s bytes.') % UPLOAD_MAX_SIZE)
+        session = self.create({
+            'name': name,
+            'mimetype': mimetype,
+            'res_model': res_model,
+            'res_id': res_id,
+            'total_size': int(total_size),
+            'checksum': checksum,
+        })
+        open(session._get_temp_path(), 'wb').close()
+        return session
+
+    def _write_chunk(self, offset, stream, length):
+        """Append ``length`` bytes read from ``stream`` at ``offset``.
+
+        The chunk is copied block by block, so neither the chunk nor the file
+        is ever held in memory. Only the next expected offset is accepted: a
+        client resuming after a failure asks for ``received_size`` first.
+        """
+        self.ensure_one()
+        if self.state != 'uploading':
+            raise UserError(_('This upload is already finished.'))
+        if offset != self.received_size:
+            raise UserError(_('Unexpected chunk offset %s, expected %s.') % (offset, self.received_size))
+        if offset + length > self.total_size:
+            raise UserError(_('The chunk exceeds the announced file size.'))
+        written = 0
+        with open(self._get_temp_path(), 'r+b') as temp_file:
+            temp_file.seek(offset)
+            while written < length:
+                block = stream.read(min(UPLOAD_STREAM_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                temp_file.write(block)
+                written += len(block)
+            # Drop any tail left by an interrupted earlier attempt
+            temp_file.truncate(offset + written)
+        self.received_size = offset + written
+        return self.received_size
+
+    @staticmethod
+    def _hash_file(path):
+        sha = hashlib.sha1()
+        with open(path, 'rb') as temp_file:
+            for block in iter(lambda: temp_file.read(UPLOAD_STREAM_BLOCK_SIZE), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def _set_failed(self):
+        """Mark the session as failed in a separate transaction, so that the
+        state survives the rollback of the error reported to the client."""
+        self.ensure_one()
+        with self.pool.cursor() as cr:
+            cr.execute("""
+                UPDATE maintenance_upload_session
+                   SET state = 'failed', write_uid = %s, write_date = NOW() AT TIME ZONE 'UTC'
+                 WHERE id = %s
+            """, [self.env.uid, self.id])
+        self.invalidate_cache(['state'], self.ids)
+
+    @staticmethod
+    def _remove_temp_file(path):
+        """Remove a partial file; a file that cannot be removed now is left
+        to the cleanup cron rather than failing the upload. Return whether
+        the file was removed."""
+        try:
+            os.unlink(path)
+        except OSError:
+            _logger.warning('Could not remove the partial upload %s', path, exc_info=True)
+            return False
+        return True
+
+    def _finish(self):
+        """Turn the complete upload into an attachment linked to its record.
+
+        An identical file already attached to the record is reused as is.
+        Otherwise the file is moved into the filestore under its checksum
+        (or dropped if the filestore already holds that content) and the
+        attachment is created around it without loading its content.
+        """
+        self.ensure_one()
+        if self.state == 'done':
+            return self.attachment_id
+        if self.state == 'failed':
+            raise UserError(_('This upload has failed, please start it again.'))
+        if self.received_size != self.total_size:
+            raise UserError(_('The upload is incomplete: %s of %s bytes received.')
+                            % (self.received_size, self.total_size))
+        path = self._get_temp_path()
+        checksum = self._hash_file(path)
+        if self.checksum and self.checksum.lower() != checksum:
+            # Persist the failure, the error rolls back the current transaction;
+            # the partial file is left to the cleanup cron
+            self._set_failed()
+            raise UserError(_('The uploaded file is corrupted (checksum mismatch).'))
+
+        # The uploader may have lost the right to edit the document meanwhile
+        record = self.env[self.res_model].with_user(self.user_id).browse(self.res_id)
+        record.check_access_rights('write')
+        record.check_access_rule('write')
+        record = record.sudo()
+        Attachment = self.env['ir.attachment'].sudo()
+        attachment = Attachment.search([
+            ('checksum', '=', checksum),
+            ('res_model', '=', self.res_model),
+            ('res_id', '=', self.res_id),
+        ], limit=1)
+        if attachment:
+            self._remove_temp_file(path)
+        elif Attachment._storage() == 'file':
+            store_fname = '%s/%s' % (checksum[:2], checksum)
+            full_path = Attachment._full_path(store_fname)
+            if os.path.exists(full_path):
+                self._remove_temp_file(path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                shutil.move(path, full_path)
+            attachment = Attachment.create({
+                'name': self.name,
+                'mimetype': self.mimetype,
+                'res_model': self.res_model,
+                'res_id': self.res_id,
+                'store_fname': store_fname,
+                'checksum': checksum,
+                'file_size': self.total_size,
+                'type': 'binary',
+            })
+        else:
+            # Database storage needs the content itself
+            with open(path, 'rb') as temp_file:
+                attachment = Attachment.create({
+                    'name': self.name,
+                    'mimetype': self.mimetype,
+                    'res_model': self.res_model,
+                    'res_id': self.res_id,
+                    'raw': temp_file.read(),
+                })
+            self._remove_temp_file(path)
+        record.write({UPLOAD_TARGETS[self.res_model]: [(4, attachment.id)]})
+        self.write({'state': 'done', 'attachment_id': attachment.id})
+        return attachment
+
+    @api.model
+    def cron_cleanup_upload_sessions(self, ttl_hours=UPLOAD_SESSION_TTL_HOURS):
+        """Drop abandoned or finished sessions and their partial files."""
+        sessions = self.search([('create_date', '<', fields.Datetime.now() - timedelta(hours=ttl_hours))])
+        removed = self.browse()
+        for session in sessions:
+            path = session._get_temp_path()
+            # Sessions whose file cannot be removed yet are retried on the next run
+            if not os.path.exists(path) or self._remove_temp_file(path):
+                removed |= session
+        sessions = removed
+        _logger.info('Removed %s maintenance upload sessions', len(sessions))
+        sessions.unlink()
+        return True
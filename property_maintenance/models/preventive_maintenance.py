@@ -1,25 +1,51 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api, _
+from odoo import models, fields, api, tools, _
 from odoo.exceptions import ValidationError
 from datetime import datetime, timedelta, time
 from dateutil.relativedelta import relativedelta
+from collections import defaultdict, namedtuple
+import logging
+import os
+import socket
+import threading
+
+import psycopg2
+
+_logger = logging.getLogger(__name__)
+
+# Recurrence step of every fixed frequency ('custom' uses the plan interval)
+FREQUENCY_STEPS = {
+    'daily': relativedelta(days=1),
+    'weekly': relativedelta(weeks=1),
+    'monthly': relativedelta(months=1),
+    'quarterly': relativedelta(months=3),
+    'semi_annual': relativedelta(months=6),
+    'annual': relativedelta(years=1),
+}
+PM_GENERATION_BATCH_SIZE = 500
+
+# One planned visit of a preventive maintenance plan
+Occurrence = namedtuple('Occurrence', ['plan_id', 'date', 'duration', 'team_id', 'category_id'])
+FORECAST_GROUPBYS = ('team_id', 'category_id', 'week', 'month')
 
 
 class PreventiveMaintenance(models.Model):
     _name = 'preventive.maintenance'
     _description = 'Preventive Maintenance Plan'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'maintenance.count.mixin',
+    ]
     _order = 'next_execution_date'
 
     name = fields.Char(string='Plan Name', required=True, tracking=True)
     code = fields.Char(string='Plan Code', required=True, tracking=True)
     description = fields.Text(string='Description')
     
-    property_id = fields.Many2one('property.property', string='Property', required=True, tracking=True)
-    building_id = fields.Many2one('property.building', string='Building', tracking=True)
-    unit_id = fields.Many2one('property.unit', string='Unit', tracking=True)
-    asset_id = fields.Many2one('property.asset', string='Asset', tracking=True)
+    property_id = fields.Many2one('property.property', string='Property', required=True, tracking=True, index=True)
+    building_id = fields.Many2one('property.building', string='Building', tracking=True, index=True)
+    unit_id = fields.Many2one('property.unit', string='Unit', tracking=True, index=True)
+    asset_id = fields.Many2one('property.asset', string='Asset', tracking=True, index=True)
     
     category_id = fields.Many2one('maintenance.category', string='Category', required=True, tracking=True)
     
@@ -37,7 +63,8 @@ class PreventiveMaintenance(models.Model):
     
     start_date = fields.Date(string='Start Date', required=True, default=fields.Date.today, tracking=True)
     end_date = fields.Date(string='End Date', tracking=True)
-    next_execution_date = fields.Date(string='Next Execution Date', compute='_compute_next_execution_date', store=True, tracking=True)
+    next_execution_date = fields.Date(string='Next Execution Date', compute='_compute_next_execution_date',
+                                      store=True, tracking=True, index=True)
     last_execution_date = fields.Date(string='Last Execution Date', readonly=True)
     
     team_id = fields.Many2one('maintenance.team', string='Maintenance Team', tracking=True)
@@ -64,12 +91,20 @@ class PreventiveMaintenance(models.Model):
     ], string='Status', default='draft', required=True, tracking=True)
     
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company, index=True)
     
     _sql_constraints = [
         ('code_unique', 'unique(code, company_id)', 'Plan code must be unique per company!')
     ]
     
+    def init(self):
+        # Plans due for generation, as selected by the generation cron
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS preventive_maintenance_due_idx
+                ON preventive_maintenance (next_execution_date)
+             WHERE active AND state = 'active'
+        """)
+    
     @api.depends('start_date', 'last_execution_date', 'frequency', 'interval', 'state')
     def _compute_next_execution_date(self):
         for record in self:
@@ -78,35 +113,38 @@ class PreventiveMaintenance(models.Model):
                 continue
             
             base_date = record.last_execution_date or record.start_date
-            if not base_date:
+            step = record._get_recurrence_step()
+            if not base_date or not step:
                 record.next_execution_date = False
                 continue
             
-            if record.frequency == 'daily':
-                record.next_execution_date = base_date + timedelta(days=1)
-            elif record.frequency == 'weekly':
-                record.next_execution_date = base_date + timedelta(weeks=1)
-            elif record.frequency == 'monthly':
-                record.next_execution_date = base_date + relativedelta(months=1)
-            elif record.frequency == 'quarterly':
-                record.next_execution_date = base_date + relativedelta(months=3)
-            elif record.frequency == 'semi_annual':
-                record.next_execution_date = base_date + relativedelta(months=6)
-            elif record.frequency == 'annual':
-                record.next_execution_date = base_date + relativedelta(years=1)
-            elif record.frequency == 'custom':
-                record.next_execution_date = base_date + timedelta(days=record.interval)
-            else:
-                record.next_execution_date = False
+            record.next_execution_date = base_date + step
             
             # Check if end date has passed
             if record.end_date and record.next_execution_date > record.end_date:
                 record.next_execution_date = False
     
+    def _get_recurrence_step(self):
+        self.ensure_one()
+        if self.frequency == 'custom':
+            return relativedelta(days=max(self.interval, 1))
+        return FREQUENCY_STEPS.get(self.frequency)
+    
+    def _get_occurrence_dates(self, date_from, date_to):
+        """Return the plan's occurrences from ``date_from`` up to ``date_to``,
+        chained by the recurrence step and bounded by ``end_date``."""
+        self.ensure_one()
+        step = self._get_recurrence_step()
+        dates = []
+        current = date_from
+        while step and current and current <= date_to and (not self.end_date or current <= self.end_date):
+            dates.append(current)
+            current = current + step
+        return dates
+    
     @api.depends('work_order_ids')
     def _compute_work_order_count(self):
-        for record in self:
-            record.work_order_count = len(record.work_order_ids)
+        self._set_relation_count('work_order_count', 'work.order', 'preventive_maintenance_id')
     
     def action_activate(self):
         self.write({'state': 'active'})
@@ -118,6 +156,26 @@ class PreventiveMaintenance(models.Model):
         self.message_post(body=_('Preventive maintenance plan suspended'))
         return True
     
+    def _prepare_work_order_vals(self, execution_date):
+        self.ensure_one()
+        return {
+            'title': f'{self.name} - {execution_date}',
+            'description': self.description or '',
+            'preventive_maintenance_id': self.id,
+            'property_id': self.property_id.id if self.property_id else False,
+            'building_id': self.building_id.id if self.building_id else False,
+            'unit_id': self.unit_id.id if self.unit_id else False,
+            'asset_id': self.asset_id.id if self.asset_id else False,
+            'category_id': self.category_id.id,
+            'work_type': 'internal',
+            'team_id': self.team_id.id if self.team_id else False,
+            'technician_ids': [(6, 0, self.technician_ids.ids)],
+            'scheduled_date': datetime.combine(execution_date, time.min),
+            'estimated_duration': self.estimated_duration,
+            'state': 'scheduled',
+            'company_id': self.company_id.id,
+        }
+    
     def action_generate_work_order(self):
         self.ensure_one()
         
@@ -137,56 +195,249 @@ class PreventiveMaintenance(models.Model):
         if existing_wo:
             return existing_wo
         
-        # Create work order
-        wo_vals = {
-            'title': f'{self.name} - {self.next_execution_date}',
-            'description': self.description or '',
-            'preventive_maintenance_id': self.id,
-            'property_id': self.property_id.id if self.property_id else False,
-            'building_id': self.building_id.id if self.building_id else False,
-            'unit_id': self.unit_id.id if self.unit_id else False,
-            'asset_id': self.asset_id.id if self.asset_id else False,
-            'category_id': self.category_id.id,
-            'work_type': 'internal',
-            'team_id': self.team_id.id if self.team_id else False,
-            'scheduled_date': datetime.combine(self.next_execution_date, time.min),
-            'state': 'scheduled',
-        }
-        
-        work_order = self.env['work.order'].create(wo_vals)
-        
-        # Add technicians
-        if self.technician_ids:
-            work_order.technician_ids = [(6, 0, self.technician_ids.ids)]
+        execution_date = self.next_execution_date
+        work_order = self.env['work.order'].create(self._prepare_work_order_vals(execution_date))
         
         # Update last execution date
-        self.write({'last_execution_date': self.next_execution_date})
+        self.write({'last_execution_date': execution_date})
         
-        self.message_post(body=_('Work order %s generated for %s') % (work_order.name, self.next_execution_date))
+        self.message_post(body=_('Work order %s generated for %s') % (work_order.name, execution_date))
         
         return work_order
     
     @api.model
-    def cron_generate_preventive_maintenance(self):
-        """Cron job to auto-generate work orders for active preventive maintenance plans"""
-        today = fields.Date.today()
+    def _claim_due_plans(self, today, limit, after_id=0, partition_by=None, partition_key=None, partition_count=1):
+        """Lock and return the next ``limit`` due plans of a partition.
         
-        # Find plans that need work orders generated
-        plans = self.search([
-            ('state', '=', 'active'),
-            ('auto_generate', '=', True),
-            ('next_execution_date', '!=', False),
-        ])
+        Plans are claimed in id order with ``FOR UPDATE SKIP LOCKED``: rows
+        locked by another worker are skipped, and the lock is held until
+        the caller commits, by which time the plans have been advanced and
+        are no longer due.
         
-        for plan in plans:
-            # Check if we should generate in advance
-            generate_date = today + timedelta(days=plan.advance_days)
-            
-            if plan.next_execution_date <= generate_date:
-                plan.action_generate_work_order()
+        :param partition_by: ``'company'`` (``partition_key`` is a company
+            id), ``'property'`` (plans whose ``property_id % partition_count``
+            equals ``partition_key``) or ``None`` for all plans
+        """
+        self.flush(['active', 'state', 'auto_generate', 'next_execution_date', 'advance_days',
+                    'company_id', 'property_id'])
+        query = """
+            SELECT id FROM preventive_maintenance
+             WHERE active AND state = 'active' AND auto_generate
+               AND next_execution_date IS NOT NULL
+               AND next_execution_date <= %(today)s::date + COALESCE(advance_days, 0)
+               AND id > %(after_id)s
+        """
+        params = {'today': today, 'after_id': after_id, 'limit': limit}
+        if partition_by == 'company':
+            query += " AND company_id = %(partition_key)s"
+            params['partition_key'] = partition_key
+        elif partition_by == 'property':
+            query += " AND property_id %% %(partition_count)s = %(partition_key)s"
+            params.update(partition_key=partition_key, partition_count=partition_count)
+        elif partition_by:
+            raise ValidationError(_('Unknown preventive maintenance partition: %s') % partition_by)
+        query += " ORDER BY id LIMIT %(limit)s FOR UPDATE SKIP LOCKED"
+        self.env.cr.execute(query, params)
+        return [row[0] for row in self.env.cr.fetchall()]
+    
+    def _get_existing_occurrences(self, date_from, date_to):
+        """Return ``{(plan_id, date)}`` of the work orders already generated for
+        ``self`` between the two dates, in one query."""
+        if not self:
+            return set()
+        self.env['work.order'].flush(['preventive_maintenance_id', 'scheduled_date', 'active'])
+        self.env.cr.execute("""
+            SELECT preventive_maintenance_id, scheduled_date::date
+              FROM work_order
+             WHERE active
+               AND preventive_maintenance_id IN %s
+               AND scheduled_date >= %s AND scheduled_date < %s
+        """, [tuple(self.ids), datetime.combine(date_from, time.min),
+              datetime.combine(date_to + timedelta(days=1), time.min)])
+        return set(self.env.cr.fetchall())
+    
+    def _generate_due_work_orders(self, today):
+        """Create every missing occurrence of ``self`` up to each plan's
+        generation horizon, lapsed occurrences included.
+        
+        Occurrences already covered by a work order are skipped, all new work
+        orders are created in one batch and the plans are advanced with one
+        write per distinct last execution date.
+        
+        :return: the created work orders
+        """
+        occurrences = {}
+        for plan in self:
+            horizon = today + timedelta(days=plan.advance_days or 0)
+            dates = plan._get_occurrence_dates(plan.next_execution_date, horizon)
+            if dates:
+                occurrences[plan] = dates
+        if not occurrences:
+            return self.env['work.order']
+        
+        all_dates = [date for dates in occurrences.values() for date in dates]
+        existing = self.browse([plan.id for plan in occurrences])._get_existing_occurrences(
+            min(all_dates), max(all_dates))
+        
+        vals_list = []
+        plans_by_last_date = defaultdict(list)
+        for plan, dates in occurrences.items():
+            vals_list.extend(
+                plan._prepare_work_order_vals(date) for date in dates if (plan.id, date) not in existing
+            )
+            plans_by_last_date[dates[-1]].append(plan.id)
+        
+        work_orders = self.env['work.order'].create(vals_list)
+        
+        for last_date, plan_ids in plans_by_last_date.items():
+            self.browse(plan_ids).with_context(tracking_disable=True).write({'last_execution_date': last_date})
         
+        names_by_plan = defaultdict(list)
+        for work_order in work_orders:
+            names_by_plan[work_order.preventive_maintenance_id.id].append(work_order.name)
+        self.browse(list(names_by_plan))._message_log_batch({
+            plan_id: _('Work orders generated: %s') % ', '.join(names)
+            for plan_id, names in names_by_plan.items()
+        })
+        return work_orders
+    
+    @api.model
+    def cron_generate_preventive_maintenance(self, batch_size=PM_GENERATION_BATCH_SIZE,
+                                             partition_by=None, partition_key=None, partition_count=1):
+        """Cron job to auto-generate work orders for active preventive maintenance plans
+        
+        Several crons may run concurrently on disjoint or overlapping
+        partitions, e.g. ``model.cron_generate_preventive_maintenance(
+        partition_by='property', partition_key=0, partition_count=4)`` and the
+        same with keys 1 to 3. Plans are claimed with row locks, so two
+        workers never generate the same occurrence.
+        """
+        today = fields.Date.today()
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        run = self.env['preventive.maintenance.run'].sudo()._start_run(partition_by, partition_key, partition_count)
+        if auto_commit:
+            self.env.cr.commit()
+        
+        after_id = 0
+        while True:
+            try:
+                plan_ids = self._claim_due_plans(today, batch_size, after_id,
+                                                 partition_by, partition_key, partition_count)
+            except psycopg2.extensions.TransactionRollbackError:
+                # A plan was advanced by a concurrent worker after our snapshot
+                if not auto_commit:
+                    raise
+                self.env.cr.rollback()
+                continue
+            if not plan_ids:
+                break
+            after_id = plan_ids[-1]
+            plans = self.browse(plan_ids)
+            try:
+                with self.env.cr.savepoint():
+                    work_orders = plans._generate_due_work_orders(today)
+                run._record_batch(len(plans), len(work_orders))
+            except Exception:
+                _logger.exception('Preventive maintenance generation failed for plans %s', plans.ids)
+                self.invalidate_cache()
+                run._record_batch(len(plans), 0, failed_count=len(plans))
+            if auto_commit:
+                self.env.cr.commit()
+        
+        run._finish_run()
+        if auto_commit:
+            self.env.cr.commit()
+        _logger.info('Preventive maintenance (%s): %s work orders generated for %s due plans',
+                     run.name, run.work_order_count, run.plan_count)
         return True
     
+    def _iter_forecast(self, date_from, date_to):
+        """Lazily yield the ``Occurrence`` of the plans of ``self`` between
+        two dates; an empty ``self`` yields nothing.
+        
+        Plan data is read with a single query and occurrences are produced on
+        the fly from each plan's next execution date, so no work order (and
+        no per-plan record) is ever created.
+        """
+        if not self:
+            return
+        query = """
+            SELECT id, frequency, interval, next_execution_date, start_date, end_date,
+                   estimated_duration, team_id, category_id
+              FROM preventive_maintenance
+             WHERE active AND state = 'active' AND next_execution_date IS NOT NULL
+               AND next_execution_date <= %(date_to)s
+               AND (end_date IS NULL OR end_date >= %(date_from)s)
+               AND id IN %(ids)s
+        """
+        params = {'date_from': date_from, 'date_to': date_to, 'ids': tuple(self.ids)}
+        self.flush(['active', 'state', 'frequency', 'interval', 'next_execution_date', 'start_date',
+                    'end_date', 'estimated_duration', 'team_id', 'category_id'])
+        self.env.cr.execute(query, params)
+        for (plan_id, frequency, interval, next_date, start_date, end_date,
+             duration, team_id, category_id) in self.env.cr.fetchall():
+            step = relativedelta(days=max(interval or 0, 1)) if frequency == 'custom' else FREQUENCY_STEPS.get(frequency)
+            if not step:
+                continue
+            last_date = min(date_to, end_date) if end_date else date_to
+            current = next_date
+            while current <= last_date:
+                if current >= date_from and current >= start_date:
+                    yield Occurrence(plan_id, current, duration or 0.0, team_id, category_id)
+                current = current + step
+    
+    def _get_forecast_aggregates(self, date_from, date_to, groupby=('team_id', 'week')):
+        """Aggregate the forecast into ``{group key tuple: {'count', 'hours'}}``.
+        
+        ``groupby`` is a sequence taken from ``FORECAST_GROUPBYS``; ``week``
+        and ``month`` keys are the first day of the period.
+        """
+        unknown = set(groupby) - set(FORECAST_GROUPBYS)
+        if unknown:
+            raise ValidationError(_('Unsupported forecast grouping: %s') % ', '.join(sorted(unknown)))
+        key_getters = {
+            'team_id': lambda occurrence: occurrence.team_id,
+            'category_id': lambda occurrence: occurrence.category_id,
+            'week': lambda occurrence: occurrence.date - timedelta(days=occurrence.date.weekday()),
+            'month': lambda occurrence: occurrence.date.replace(day=1),
+        }
+        getters = [key_getters[name] for name in groupby]
+        aggregates = defaultdict(lambda: {'count': 0, 'hours': 0.0})
+        for occurrence in self._iter_forecast(date_from, date_to):
+            bucket = aggregates[tuple(getter(occurrence) for getter in getters)]
+            bucket['count'] += 1
+            bucket['hours'] += occurrence.duration
+        return dict(aggregates)
+    
+    @api.model
+    def get_forecast(self, months=12, groupby=('team_id', 'week'), plan_ids=None):
+        """Forecast planned visits for the next ``months`` months (RPC friendly).
+        
+        :param plan_ids: plans to forecast, all the active plans if ``None``;
+                         only plans of the allowed companies are forecast
+        :return: list of dicts with one entry per group: the grouping values
+                 plus ``count`` and ``hours``
+        """
+        date_from = fields.Date.context_today(self)
+        date_to = date_from + relativedelta(months=months)
+        # The forecast reads plans in raw SQL: resolve them with the ORM first,
+        # so that access rules and the allowed companies apply
+        domain = [
+            ('state', '=', 'active'),
+            ('next_execution_date', '<=', date_to),
+            '|', ('company_id', '=', False), ('company_id', 'in', self.env.companies.ids),
+        ]
+        if plan_ids is not None:
+            domain.append(('id', 'in', list(plan_ids)))
+        plans = self.search(domain)
+        result = []
+        for key, values in sorted(plans._get_forecast_aggregates(date_from, date_to, groupby).items(),
+                                  key=lambda item: tuple(str(value) for value in item[0])):
+            entry = dict(zip(groupby, key))
+            entry.update(values)
+            result.append(entry)
+        return result
+    
     def action_view_work_orders(self):
         self.ensure_one()
         return {
@@ -199,7 +450,69 @@ class PreventiveMaintenance(models.Model):
         }
 
 
+class PreventiveMaintenanceRun(models.Model):
+    _name = 'preventive.maintenance.run'
+    _description = 'Preventive Maintenance Generation Run'
+    _order = 'start_date desc'
+
+    name = fields.Char(string='Partition', required=True, readonly=True)
+    worker = fields.Char(string='Worker', readonly=True)
+    start_date = fields.Datetime(string='Started', readonly=True)
+    end_date = fields.Datetime(string='Finished', readonly=True)
+    state = fields.Selection([
+        ('running', 'Running'),
+        ('done', 'Done'),
+    ], string='Status', default='running', readonly=True)
+    
+    plan_count = fields.Integer(string='Plans Processed', readonly=True)
+    failed_plan_count = fields.Integer(string='Plans Failed', readonly=True)
+    work_order_count = fields.Integer(string='Work Orders Created', readonly=True)
+    duration = fields.Float(string='Duration (s)', compute='_compute_throughput', store=True)
+    throughput = fields.Float(string='Work Orders / s', compute='_compute_throughput', store=True)
+    
+    @api.depends('start_date', 'end_date', 'work_order_count')
+    def _compute_throughput(self):
+        for run in self:
+            if run.start_date and run.end_date:
+                run.duration = (run.end_date - run.start_date).total_seconds()
+                run.throughput = run.work_order_count / run.duration if run.duration else 0.0
+            else:
+                run.duration = 0.0
+                run.throughput = 0.0
+    
+    @api.model
+    def _start_run(self, partition_by, partition_key, partition_count):
+        if partition_by == 'property':
+            name = 'property %s/%s' % (partition_key, partition_count)
+        elif partition_by:
+            name = '%s %s' % (partition_by, partition_key)
+        else:
+            name = 'all'
+        return self.create({
+            'name': name,
+            'worker': '%s-%s' % (socket.gethostname(), os.getpid()),
+            'start_date': fields.Datetime.now(),
+        })
+    
+    def _record_batch(self, plan_count, work_order_count, failed_count=0):
+        self.ensure_one()
+        self.write({
+            'plan_count': self.plan_count + plan_count,
+            'work_order_count': self.work_order_count + work_order_count,
+            'failed_plan_count': self.failed_plan_count + failed_count,
+        })
+    
+    def _finish_run(self):
+        self.write({'state': 'done', 'end_date': fields.Datetime.now()})
+
+
 class WorkOrder(models.Model):
     _inherit = 'work.order'
     
     preventive_maintenance_id = fields.Many2one('preventive.maintenance', string='Preventive Maintenance Plan', readonly=True)
+    
+    def init(self):
+        super(WorkOrder, self).init()
+        # Work orders of a plan by date: plan history and duplicate checks on generation
+        tools.create_index(self.env.cr, 'work_order_plan_scheduled_date_idx', self._table,
+                           ['preventive_maintenance_id', 'scheduled_date'])
@@ -6,7 +6,9 @@ from odoo import models, fields, api
 class Property(models.Model):
     _name = 'property.property'
     _description = 'Property'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'maintenance.count.mixin',
+    ]
     _order = 'name'
 
     name = fields.Char(string='Property Name', required=True, tracking=True)
@@ -25,7 +27,7 @@ class Property(models.Model):
         ('mixed', 'Mixed Use'),
     ], string='Property Type', required=True, default='residential', tracking=True)
     
-    owner_id = fields.Many2one('res.partner', string='Owner', domain=[('is_property_owner', '=', True)])
+    owner_id = fields.Many2one('res.partner', string='Owner', domain=[('is_property_owner', '=', True)], index=True)
     manager_id = fields.Many2one('res.users', string='Property Manager', tracking=True)
     
     building_ids = fields.One2many('property.building', 'property_id', string='Buildings')
@@ -34,9 +36,15 @@ class Property(models.Model):
     maintenance_request_ids = fields.One2many('maintenance.request', 'property_id', string='Maintenance Requests')
     maintenance_count = fields.Integer(string='Maintenance Count', compute='_compute_maintenance_count')
     
+    # Portfolio rollup (maintained by maintenance.portfolio.rollup)
+    open_request_count = fields.Integer(string='Open Requests', readonly=True, copy=False)
+    overdue_request_count = fields.Integer(string='Overdue Requests', readonly=True, copy=False)
+    mtd_maintenance_cost = fields.Float(string='Maintenance Cost (MTD)', readonly=True, copy=False)
+    mttr_hours = fields.Float(string='MTTR (Hours)', readonly=True, copy=False)
+    
     notes = fields.Text(string='Notes')
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company, index=True)
     
     _sql_constraints = [
         ('code_unique', 'unique(code, company_id)', 'Property code must be unique per company!')
@@ -44,13 +52,11 @@ class Property(models.Model):
     
     @api.depends('building_ids')
     def _compute_building_count(self):
-        for record in self:
-            record.building_count = len(record.building_ids)
+        self._set_relation_count('building_count', 'property.building', 'property_id')
     
     @api.depends('maintenance_request_ids')
     def _compute_maintenance_count(self):
-        for record in self:
-            record.maintenance_count = len(record.maintenance_request_ids)
+        self._set_relation_count('maintenance_count', 'maintenance.request', 'property_id')
     
     def action_view_buildings(self):
         self.ensure_one()
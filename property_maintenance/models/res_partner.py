@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields
+from odoo import models, fields, api
+
+PORTAL_COUNTER_QUEUE_KEY = 'property_maintenance.portal_counter_partner_ids'
 
 
 class ResPartner(models.Model):
@@ -36,3 +38,61 @@ class ResPartner(models.Model):
         'owner_id', 
         string='Owned Properties'
     )
+    
+    # Portal counters, maintained from the maintenance requests
+    maintenance_request_count = fields.Integer(string='Maintenance Requests', readonly=True, copy=False)
+    open_maintenance_request_count = fields.Integer(string='Open Maintenance Requests', readonly=True, copy=False)
+    
+    @api.model
+    def _queue_maintenance_counter_refresh(self, partner_ids):
+        """Schedule the portal counters of ``partner_ids`` for a refresh at
+        the end of the transaction."""
+        partner_ids = {partner_id for partner_id in partner_ids if partner_id}
+        if not partner_ids:
+            return
+        queue = self.env.cr.precommit.data.get(PORTAL_COUNTER_QUEUE_KEY)
+        if queue is None:
+            queue = self.env.cr.precommit.data[PORTAL_COUNTER_QUEUE_KEY] = set()
+            self.env.cr.precommit.add(self.sudo()._process_maintenance_counter_queue)
+        queue.update(partner_ids)
+    
+    def _process_maintenance_counter_queue(self):
+        partner_ids = self.env.cr.precommit.data.pop(PORTAL_COUNTER_QUEUE_KEY, set())
+        if partner_ids:
+            self._refresh_maintenance_counters(list(partner_ids))
+    
+    @api.model
+    def _refresh_maintenance_counters(self, partner_ids):
+        """Recount the requests of ``partner_ids`` as tenant or owner with
+        one UPDATE, using the tenant and owner indexes."""
+        self.env['maintenance.request'].flush(['tenant_id', 'owner_id', 'stage_id', 'active'])
+        self.env.cr.execute("""
+            UPDATE res_partner p
+               SET maintenance_request_count = c.total_count,
+                   open_maintenance_request_count = c.open_count
+              FROM (
+                    SELECT k.id,
+                           COUNT(r.id) AS total_count,
+                           COUNT(r.id) FILTER (WHERE NOT COALESCE(s.done, FALSE)
+                                                 AND NOT COALESCE(s.cancelled, FALSE)) AS open_count
+                      FROM unnest(%s::int[]) AS k(id)
+                      LEFT JOIN maintenance_request r
+                        ON r.active AND (r.tenant_id = k.id OR r.owner_id = k.id)
+                      LEFT JOIN maintenance_stage s ON s.id = r.stage_id
+                     GROUP BY k.id
+                   ) c
+             WHERE c.id = p.id
+        """, [list(partner_ids)])
+        self.invalidate_cache(['maintenance_request_count', 'open_maintenance_request_count'], list(partner_ids))
+    
+    @api.model
+    def cron_reconcile_maintenance_counters(self):
+        """Recount every tenant and owner, e.g. after stage flag changes."""
+        self.env.cr.execute("""
+            SELECT id FROM res_partner
+             WHERE maintenance_request_count > 0 OR is_tenant OR is_property_owner
+        """)
+        partner_ids = [row[0] for row in self.env.cr.fetchall()]
+        for index in range(0, len(partner_ids), 5000):
+            self._refresh_maintenance_counters(partner_ids[index:index + 5000])
+        return True
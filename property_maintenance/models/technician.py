@@ -1,12 +1,18 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from collections import defaultdict
+from datetime import timedelta
+
+from .work_order import TechnicianSchedule
 
 
 class MaintenanceTechnician(models.Model):
     _name = 'maintenance.technician'
     _description = 'Maintenance Technician'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'maintenance.count.mixin',
+    ]
     _order = 'name'
 
     name = fields.Char(string='Technician Name', required=True, tracking=True)
@@ -15,7 +21,7 @@ class MaintenanceTechnician(models.Model):
     user_id = fields.Many2one('res.users', string='User', tracking=True)
     employee_id = fields.Many2one('hr.employee', string='Employee', tracking=True)
     
-    team_id = fields.Many2one('maintenance.team', string='Team', tracking=True)
+    team_id = fields.Many2one('maintenance.team', string='Team', tracking=True, index=True)
     
     category_ids = fields.Many2many('maintenance.category', 'technician_category_rel', 
                                     'technician_id', 'category_id', string='Specializations')
@@ -25,14 +31,20 @@ class MaintenanceTechnician(models.Model):
     mobile = fields.Char(string='Mobile')
     
     hourly_rate = fields.Float(string='Hourly Rate', tracking=True)
+    daily_capacity_hours = fields.Float(string='Daily Capacity (Hours)', default=8.0, tracking=True)
     
     work_order_ids = fields.Many2many('work.order', 'work_order_technician_rel', 
                                       'technician_id', 'work_order_id', string='Work Orders')
     work_order_count = fields.Integer(string='Work Orders', compute='_compute_work_order_count')
     
+    workload_ids = fields.One2many('maintenance.technician.workload', 'technician_id', string='Workload')
+    week_scheduled_hours = fields.Float(string='Scheduled This Week', compute='_compute_week_workload')
+    week_utilization = fields.Float(string='Utilization This Week (%)', compute='_compute_week_workload')
+    week_overloaded_days = fields.Integer(string='Overloaded Days This Week', compute='_compute_week_workload')
+    
     notes = fields.Text(string='Notes')
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company, index=True)
     
     _sql_constraints = [
         ('code_unique', 'unique(code, company_id)', 'Employee code must be unique per company!')
@@ -40,8 +52,70 @@ class MaintenanceTechnician(models.Model):
     
     @api.depends('work_order_ids')
     def _compute_work_order_count(self):
-        for record in self:
-            record.work_order_count = len(record.work_order_ids)
+        self._set_relation_count('work_order_count', 'work.order', 'technician_ids')
+    
+    def write(self, vals):
+        res = super(MaintenanceTechnician, self).write(vals)
+        if {'team_id', 'company_id', 'daily_capacity_hours'} & set(vals):
+            self.env['maintenance.technician.workload']._refresh_technician_capacity(self.ids)
+        return res
+    
+    def _compute_week_workload(self):
+        """Read the next seven days from the workload buckets with grouped
+        queries covering all technicians at once."""
+        today = fields.Date.context_today(self)
+        Workload = self.env['maintenance.technician.workload']
+        domain = [
+            ('technician_id', 'in', self.ids),
+            ('day', '>=', today),
+            ('day', '<', today + timedelta(days=7)),
+        ]
+        hours = {
+            group['technician_id'][0]: group['scheduled_hours']
+            for group in Workload.read_group(domain, ['technician_id', 'scheduled_hours:sum'],
+                                             ['technician_id'], lazy=False)
+        }
+        overloaded = {
+            group['technician_id'][0]: group['__count']
+            for group in Workload.read_group(domain + [('overloaded', '=', True)], ['technician_id'],
+                                             ['technician_id'], lazy=False)
+        }
+        for technician in self:
+            technician.week_scheduled_hours = hours.get(technician.id, 0.0)
+            capacity = technician.daily_capacity_hours * 7
+            technician.week_utilization = 100.0 * technician.week_scheduled_hours / capacity if capacity else 0.0
+            technician.week_overloaded_days = overloaded.get(technician.id, 0)
+    
+    def action_view_workload(self):
+        self.ensure_one()
+        return {
+            'name': _('Workload'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'maintenance.technician.workload',
+            'view_mode': 'pivot,tree',
+            'domain': [('technician_id', '=', self.id)],
+            'context': {'search_default_upcoming': 1},
+        }
+    
+    def _get_schedules(self, date_from, date_to):
+        """Return ``{technician_id: TechnicianSchedule}`` holding the open
+        work orders of ``self`` overlapping the window, loaded in one query."""
+        self.env['work.order'].flush(['technician_ids', 'scheduled_date', 'estimated_duration', 'state', 'active'])
+        intervals = defaultdict(list)
+        if self:
+            self.env.cr.execute("""
+                SELECT rel.technician_id, wo.scheduled_date, COALESCE(NULLIF(wo.estimated_duration, 0), 1.0)
+                  FROM work_order_technician_rel rel
+                  JOIN work_order wo ON wo.id = rel.work_order_id
+                 WHERE rel.technician_id IN %s
+                   AND wo.active
+                   AND wo.state IN ('scheduled', 'in_progress', 'on_hold')
+                   AND wo.scheduled_date < %s
+                   AND wo.scheduled_date + COALESCE(NULLIF(wo.estimated_duration, 0), 1.0) * INTERVAL '1 hour' > %s
+            """, [tuple(self.ids), date_to, date_from])
+            for technician_id, start, duration in self.env.cr.fetchall():
+                intervals[technician_id].append((start, start + timedelta(hours=duration)))
+        return {technician.id: TechnicianSchedule(intervals[technician.id]) for technician in self}
     
     @api.onchange('user_id')
     def _onchange_user_id(self):
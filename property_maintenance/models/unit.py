@@ -6,13 +6,17 @@ from odoo import models, fields, api
 class Unit(models.Model):
     _name = 'property.unit'
     _description = 'Property Unit'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin', 'maintenance.count.mixin',
+    ]
     _order = 'name'
 
     name = fields.Char(string='Unit Name', required=True, tracking=True)
     code = fields.Char(string='Unit Code', required=True, tracking=True)
-    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade', tracking=True)
-    building_id = fields.Many2one('property.building', string='Building', required=True, ondelete='cascade', tracking=True)
+    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade',
+                                  tracking=True, index=True)
+    building_id = fields.Many2one('property.building', string='Building', required=True, ondelete='cascade',
+                                  tracking=True, index=True)
     
     floor = fields.Integer(string='Floor')
     unit_type = fields.Selection([
@@ -35,8 +39,8 @@ class Unit(models.Model):
         ('reserved', 'Reserved'),
     ], string='Status', default='available', tracking=True)
     
-    tenant_id = fields.Many2one('res.partner', string='Current Tenant', domain=[('is_tenant', '=', True)])
-    owner_id = fields.Many2one('res.partner', string='Owner', domain=[('is_property_owner', '=', True)])
+    tenant_id = fields.Many2one('res.partner', string='Current Tenant', domain=[('is_tenant', '=', True)], index=True)
+    owner_id = fields.Many2one('res.partner', string='Owner', domain=[('is_property_owner', '=', True)], index=True)
     
     asset_ids = fields.One2many('property.asset', 'unit_id', string='Assets')
     asset_count = fields.Integer(string='Asset Count', compute='_compute_asset_count')
@@ -46,7 +50,7 @@ class Unit(models.Model):
     
     notes = fields.Text(string='Notes')
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', related='property_id.company_id', store=True)
+    company_id = fields.Many2one('res.company', string='Company', related='property_id.company_id', store=True, index=True)
     
     _sql_constraints = [
         ('code_unique', 'unique(code, building_id)', 'Unit code must be unique per building!')
@@ -54,13 +58,11 @@ class Unit(models.Model):
     
     @api.depends('asset_ids')
     def _compute_asset_count(self):
-        for record in self:
-            record.asset_count = len(record.asset_ids)
+        self._set_relation_count('asset_count', 'property.asset', 'unit_id')
     
     @api.depends('maintenance_request_ids')
     def _compute_maintenance_count(self):
-        for record in self:
-            record.maintenance_count = len(record.maintenance_request_ids)
+        self._set_relation_count('maintenance_count', 'maintenance.request', 'unit_id')
     
     @api.onchange('building_id')
     def _onchange_building_id(self):
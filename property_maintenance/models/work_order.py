@@ -1,25 +1,79 @@
 # -*- coding: utf-8 -*-
 
 from odoo import models, fields, api, _
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+import bisect
+
+from .maintenance_contractor_scorecard import SCORECARD_TRIGGER_FIELDS
+from .maintenance_technician_workload import WORKLOAD_TRIGGER_FIELDS
+
+# Work order fields feeding the portfolio rollup of their building
+ROLLUP_TRIGGER_FIELDS = {'building_id', 'state', 'end_date', 'active'}
+
+# Work order fields deciding in which monthly cost cube cell its lines land
+CUBE_TRIGGER_FIELDS = {
+    'end_date', 'scheduled_date', 'state', 'property_id', 'building_id', 'category_id', 'asset_id', 'active',
+}
+
+COST_FIELDS = ['labor_cost', 'material_cost', 'contractor_cost', 'other_cost', 'total_cost']
+COST_RECOMPUTE_BATCH_SIZE = 10000
+INVOICE_BATCH_SIZE = 500
+
+
+class TechnicianSchedule(object):
+    """Booked time of one technician as sorted, non-overlapping intervals.
+    
+    Overlap checks and bookings are ``O(log n)`` lookups through ``bisect``.
+    """
+    
+    def __init__(self, intervals=()):
+        self.starts = []
+        self.ends = []
+        self.booked_hours = 0.0
+        # Existing commitments may overlap each other: merge them on load
+        for start, end in sorted(intervals):
+            if self.ends and start < self.ends[-1]:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+            self.booked_hours += (end - start).total_seconds() / 3600
+    
+    def is_free(self, start, end):
+        index = bisect.bisect_right(self.starts, start)
+        if index and self.ends[index - 1] > start:
+            return False
+        return index == len(self.starts) or self.starts[index] >= end
+    
+    def book(self, start, end):
+        index = bisect.bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.booked_hours += (end - start).total_seconds() / 3600
 
 
 class WorkOrder(models.Model):
     _name = 'work.order'
     _description = 'Work Order'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = [
+        'maintenance.bulk.tracking.mixin', 'mail.thread', 'mail.activity.mixin',
+    ]
     _order = 'create_date desc'
 
     name = fields.Char(string='Work Order Number', required=True, readonly=True, copy=False, default='New')
     title = fields.Char(string='Work Order Title', required=True, tracking=True)
     description = fields.Html(string='Description')
     
-    maintenance_request_id = fields.Many2one('maintenance.request', string='Maintenance Request', tracking=True)
+    maintenance_request_id = fields.Many2one('maintenance.request', string='Maintenance Request', tracking=True,
+                                             index=True)
     
-    property_id = fields.Many2one('property.property', string='Property', required=True, tracking=True)
-    building_id = fields.Many2one('property.building', string='Building', required=True, tracking=True)
-    unit_id = fields.Many2one('property.unit', string='Unit', tracking=True)
-    asset_id = fields.Many2one('property.asset', string='Asset', tracking=True)
+    property_id = fields.Many2one('property.property', string='Property', required=True, tracking=True, index=True)
+    building_id = fields.Many2one('property.building', string='Building', required=True, tracking=True, index=True)
+    unit_id = fields.Many2one('property.unit', string='Unit', tracking=True, index=True)
+    asset_id = fields.Many2one('property.asset', string='Asset', tracking=True, index=True)
     
     category_id = fields.Many2one('maintenance.category', string='Category', required=True, tracking=True)
     
@@ -32,9 +86,12 @@ class WorkOrder(models.Model):
     team_id = fields.Many2one('maintenance.team', string='Maintenance Team', tracking=True)
     technician_ids = fields.Many2many('maintenance.technician', 'work_order_technician_rel', 
                                       'work_order_id', 'technician_id', string='Technicians')
-    contractor_id = fields.Many2one('maintenance.contractor', string='Contractor', tracking=True)
+    contractor_id = fields.Many2one('maintenance.contractor', string='Contractor', tracking=True, index=True)
+    contractor_compliance_state = fields.Selection(related='contractor_id.compliance_state',
+                                                   string='Contractor Compliance')
     
-    scheduled_date = fields.Datetime(string='Scheduled Date', required=True, tracking=True)
+    scheduled_date = fields.Datetime(string='Scheduled Date', required=True, tracking=True, index=True)
+    estimated_duration = fields.Float(string='Estimated Duration (Hours)', default=1.0)
     start_date = fields.Datetime(string='Start Date', tracking=True)
     end_date = fields.Datetime(string='End Date', tracking=True)
     
@@ -56,6 +113,7 @@ class WorkOrder(models.Model):
     labor_cost = fields.Float(string='Labor Cost', compute='_compute_costs', store=True)
     material_cost = fields.Float(string='Material Cost', compute='_compute_costs', store=True)
     contractor_cost = fields.Float(string='Contractor Cost', compute='_compute_costs', store=True)
+    other_cost = fields.Float(string='Other Cost', compute='_compute_costs', store=True)
     total_cost = fields.Float(string='Total Cost', compute='_compute_costs', store=True, tracking=True)
     
     # Billing
@@ -66,8 +124,8 @@ class WorkOrder(models.Model):
         ('company', 'Company'),
     ], string='Bill To', tracking=True)
     
-    tenant_id = fields.Many2one('res.partner', string='Tenant', domain=[('is_tenant', '=', True)])
-    owner_id = fields.Many2one('res.partner', string='Owner', domain=[('is_property_owner', '=', True)])
+    tenant_id = fields.Many2one('res.partner', string='Tenant', domain=[('is_tenant', '=', True)], index=True)
+    owner_id = fields.Many2one('res.partner', string='Owner', domain=[('is_property_owner', '=', True)], index=True)
     
     invoice_id = fields.Many2one('account.move', string='Customer Invoice', readonly=True)
     vendor_bill_ids = fields.One2many('account.move', 'work_order_id', string='Vendor Bills', 
@@ -82,13 +140,107 @@ class WorkOrder(models.Model):
                                       'work_order_id', 'attachment_id', string='Attachments')
     
     active = fields.Boolean(string='Active', default=True)
-    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
+    company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company, index=True)
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Reserve all missing numbers in one sequence round-trip
+        to_number = [vals for vals in vals_list if vals.get('name', 'New') == 'New']
+        names = self.env['ir.sequence']._next_block_by_code('work.order', len(to_number))
+        for vals, name in zip(to_number, names):
+            vals['name'] = name or 'New'
+        work_orders = super(WorkOrder, self).create(vals_list)
+        self.env['maintenance.portfolio.rollup']._queue_refresh(work_orders.building_id.ids)
+        self.env['maintenance.technician.workload']._queue_refresh(work_orders._get_workload_keys())
+        self.env['maintenance.contractor.scorecard']._queue_refresh(work_orders._get_scorecard_keys())
+        self.env['ir.attachment']._queue_maintenance_derivatives(work_orders.attachment_ids.ids)
+        return work_orders
     
-    @api.model
-    def create(self, vals):
-        if vals.get('name', 'New') == 'New':
-            vals['name'] = self.env['ir.sequence'].next_by_code('work.order') or 'New'
-        return super(WorkOrder, self).create(vals)
+    def write(self, vals):
+        rollup_building_ids = self.building_id.ids if ROLLUP_TRIGGER_FIELDS & set(vals) else []
+        cube_dirty = bool(CUBE_TRIGGER_FIELDS & set(vals))
+        workload_keys = self._get_workload_keys() if WORKLOAD_TRIGGER_FIELDS & set(vals) else None
+        scorecard_keys = self._get_scorecard_keys() if SCORECARD_TRIGGER_FIELDS & set(vals) else None
+        if cube_dirty:
+            self.env['maintenance.cost.cube']._mark_work_orders_dirty(self)
+        res = super(WorkOrder, self).write(vals)
+        if rollup_building_ids:
+            self.env['maintenance.portfolio.rollup']._queue_refresh(rollup_building_ids + self.building_id.ids)
+        if cube_dirty:
+            self.env['maintenance.cost.cube']._mark_work_orders_dirty(self)
+        if workload_keys is not None:
+            # Old buckets lose the work order, new ones gain it
+            self.env['maintenance.technician.workload']._queue_refresh(workload_keys | self._get_workload_keys())
+        if scorecard_keys is not None:
+            self.env['maintenance.contractor.scorecard']._queue_refresh(scorecard_keys | self._get_scorecard_keys())
+        if 'attachment_ids' in vals:
+            self.env['ir.attachment']._queue_maintenance_derivatives(self.attachment_ids.ids)
+        return res
+    
+    def unlink(self):
+        rollup_building_ids = self.building_id.ids
+        workload_keys = self._get_workload_keys()
+        scorecard_keys = self._get_scorecard_keys()
+        self.env['maintenance.cost.cube']._mark_work_orders_dirty(self)
+        res = super(WorkOrder, self).unlink()
+        self.env['maintenance.portfolio.rollup']._queue_refresh(rollup_building_ids)
+        self.env['maintenance.technician.workload']._queue_refresh(workload_keys)
+        self.env['maintenance.contractor.scorecard']._queue_refresh(scorecard_keys)
+        return res
+    
+    def init(self):
+        # Completed work orders waiting to be invoiced, see the invoicing wizard
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS work_order_to_invoice_idx
+                ON work_order (end_date)
+             WHERE active AND billable AND invoice_id IS NULL AND state = 'completed'
+        """)
+        # Completed work orders by cost month, the ``month`` column of the
+        # cost report view filtered by the cost cube refresh
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS work_order_cost_month_idx
+                ON work_order ((date_trunc('month', COALESCE(end_date, scheduled_date))::date))
+             WHERE active AND state = 'completed'
+        """)
+    
+    def _get_workload_keys(self):
+        """Return the ``(technician_id, day)`` workload buckets of ``self``."""
+        return {
+            (technician_id, work_order.scheduled_date.date())
+            for work_order in self if work_order.scheduled_date
+            for technician_id in work_order.technician_ids.ids
+        }
+    
+    def _get_scorecard_keys(self):
+        """Return the ``(contractor_id, category_id)`` scorecards the
+        completed work orders of ``self`` count in."""
+        return {
+            (work_order.contractor_id.id, work_order.category_id.id)
+            for work_order in self if work_order.state == 'completed' and work_order.contractor_id
+        }
+    
+    @api.constrains('contractor_id')
+    def _check_contractor_compliance(self):
+        expired = self.filtered(lambda wo: wo.contractor_id.compliance_state == 'expired')
+        if expired:
+            raise ValidationError(_(
+                'The license or insurance of contractor %s has expired; it cannot be assigned to work orders.'
+            ) % ', '.join(expired.contractor_id.mapped('name')))
+    
+    @api.onchange('contractor_id')
+    def _onchange_contractor_compliance(self):
+        if self.contractor_id.compliance_state == 'expiring':
+            return {'warning': {
+                'title': _('Contractor Compliance'),
+                'message': _('The license or insurance of %s expires on %s.') % (
+                    self.contractor_id.name, self.contractor_id.compliance_expiry),
+            }}
+    
+    @api.onchange('work_type', 'category_id')
+    def _onchange_suggest_contractor(self):
+        if self.work_type in ('contractor', 'mixed') and self.category_id and not self.contractor_id:
+            self.contractor_id = self.env['maintenance.contractor.scorecard']._rank_contractors(
+                self.category_id.id, self.company_id.id, limit=1)
     
     @api.depends('start_date', 'end_date')
     def _compute_duration(self):
@@ -99,17 +251,119 @@ class WorkOrder(models.Model):
             else:
                 record.duration_hours = 0.0
     
-    @api.depends('cost_line_ids', 'cost_line_ids.subtotal')
+    @api.depends('cost_line_ids', 'cost_line_ids.subtotal', 'cost_line_ids.cost_type')
     def _compute_costs(self):
+        stored_ids = [record.id for record in self if isinstance(record.id, int)]
+        costs = self.env['maintenance.cost.line']._aggregate_costs(stored_ids)
         for record in self:
-            labor_cost = sum(record.cost_line_ids.filtered(lambda l: l.cost_type == 'labor').mapped('subtotal'))
-            material_cost = sum(record.cost_line_ids.filtered(lambda l: l.cost_type == 'material').mapped('subtotal'))
-            contractor_cost = sum(record.cost_line_ids.filtered(lambda l: l.cost_type == 'contractor').mapped('subtotal'))
-            
-            record.labor_cost = labor_cost
-            record.material_cost = material_cost
-            record.contractor_cost = contractor_cost
-            record.total_cost = labor_cost + material_cost + contractor_cost
+            if isinstance(record.id, int):
+                totals = costs.get(record.id, {})
+            else:
+                # Unsaved lines (form onchange) only exist in memory
+                totals = defaultdict(float)
+                for line in record.cost_line_ids:
+                    totals[line.cost_type] += line.subtotal
+            record.labor_cost = totals.get('labor', 0.0)
+            record.material_cost = totals.get('material', 0.0)
+            record.contractor_cost = totals.get('contractor', 0.0)
+            record.other_cost = totals.get('other', 0.0)
+            record.total_cost = sum(totals.values())
+    
+    def _recompute_costs(self, batch_size=COST_RECOMPUTE_BATCH_SIZE):
+        """Refresh the stored cost totals of ``self`` with one UPDATE per chunk.
+        
+        Meant for mass repairs such as a rate change applied to existing
+        lines, where the regular recompute would write every work order
+        separately. Dependent fields (request actual cost) are marked for
+        recomputation as usual.
+        """
+        self.env['maintenance.cost.line'].flush(['work_order_id', 'cost_type', 'subtotal'])
+        for index in range(0, len(self), batch_size):
+            chunk = self[index:index + batch_size]
+            self.env.cr.execute("""
+                UPDATE work_order wo
+                   SET labor_cost = agg.labor_cost,
+                       material_cost = agg.material_cost,
+                       contractor_cost = agg.contractor_cost,
+                       other_cost = agg.other_cost,
+                       total_cost = agg.labor_cost + agg.material_cost + agg.contractor_cost + agg.other_cost
+                  FROM (
+                        SELECT w.id,
+                               COALESCE(SUM(l.subtotal) FILTER (WHERE l.cost_type = 'labor'), 0) AS labor_cost,
+                               COALESCE(SUM(l.subtotal) FILTER (WHERE l.cost_type = 'material'), 0) AS material_cost,
+                               COALESCE(SUM(l.subtotal) FILTER (WHERE l.cost_type = 'contractor'), 0) AS contractor_cost,
+                               COALESCE(SUM(l.subtotal) FILTER (WHERE l.cost_type = 'other'), 0) AS other_cost
+                          FROM work_order w
+                          LEFT JOIN maintenance_cost_line l ON l.work_order_id = w.id
+                         WHERE w.id IN %s
+                         GROUP BY w.id
+                       ) agg
+                 WHERE agg.id = wo.id
+            """, [tuple(chunk.ids)])
+            chunk.invalidate_cache(COST_FIELDS, chunk.ids)
+            chunk.modified(COST_FIELDS)
+        self.env['maintenance.portfolio.rollup']._queue_refresh(self.building_id.ids)
+        return True
+    
+    def _get_planned_end(self):
+        self.ensure_one()
+        return self.scheduled_date + timedelta(hours=self.estimated_duration or 1.0)
+    
+    def _dispatch_technicians(self):
+        """Assign a technician to every work order of ``self`` that has none.
+        
+        A technician qualifies when their specializations (or, without any,
+        their team's) include the work order category, they belong to the
+        work order team if one is set, and they share its company. Among
+        the qualified technicians free for the whole slot, the least booked
+        one is chosen; commitments are tracked in a ``TechnicianSchedule``
+        per technician, preloaded with one query.
+        
+        :return: list of conflict dicts ``{'work_order_id', 'reason'}`` with
+                 reason ``'no_technician'`` or ``'busy'``
+        """
+        orders = self.filtered(
+            lambda wo: wo.scheduled_date and not wo.technician_ids and wo.state in ('draft', 'scheduled')
+        ).sorted(lambda wo: (wo.scheduled_date, wo.id))
+        if not orders:
+            return []
+        
+        technicians = self.env['maintenance.technician'].search([
+            ('company_id', 'in', orders.company_id.ids + [False]),
+        ])
+        skills = {}
+        for technician in technicians:
+            categories = technician.category_ids or technician.team_id.category_ids
+            skills[technician.id] = (set(categories.ids), technician.team_id.id, technician.company_id.id)
+        
+        window_start = orders[0].scheduled_date
+        window_end = max(order._get_planned_end() for order in orders)
+        schedules = technicians._get_schedules(window_start, window_end)
+        
+        assignments = defaultdict(list)
+        conflicts = []
+        for order in orders:
+            start, end = order.scheduled_date, order._get_planned_end()
+            candidates = [
+                technician_id for technician_id, (category_ids, team_id, company_id) in skills.items()
+                if order.category_id.id in category_ids
+                and (not order.team_id or team_id == order.team_id.id)
+                and (not company_id or company_id == order.company_id.id)
+            ]
+            if not candidates:
+                conflicts.append({'work_order_id': order.id, 'reason': 'no_technician'})
+                continue
+            free = [technician_id for technician_id in candidates if schedules[technician_id].is_free(start, end)]
+            if not free:
+                conflicts.append({'work_order_id': order.id, 'reason': 'busy'})
+                continue
+            technician_id = min(free, key=lambda tech_id: (schedules[tech_id].booked_hours, tech_id))
+            schedules[technician_id].book(start, end)
+            assignments[technician_id].append(order.id)
+        
+        for technician_id, order_ids in assignments.items():
+            self.browse(order_ids).write({'technician_ids': [(4, technician_id)]})
+        return conflicts
     
     def action_schedule(self):
         self.write({'state': 'scheduled'})
@@ -129,7 +383,7 @@ class WorkOrder(models.Model):
         
         # Update maintenance request
         if self.maintenance_request_id:
-            in_progress_stage = self.env['maintenance.stage'].search([('code', '=', 'in_progress')], limit=1)
+            in_progress_stage = self.env['maintenance.stage']._get_stage_by_code('in_progress')
             if in_progress_stage:
                 self.maintenance_request_id.write({'stage_id': in_progress_stage.id})
         
@@ -151,7 +405,7 @@ class WorkOrder(models.Model):
         
         # Update maintenance request
         if self.maintenance_request_id:
-            completed_stage = self.env['maintenance.stage'].search([('code', '=', 'completed')], limit=1)
+            completed_stage = self.env['maintenance.stage']._get_stage_by_code('completed')
             if completed_stage:
                 self.maintenance_request_id.write({
                     'stage_id': completed_stage.id,
@@ -173,51 +427,107 @@ class WorkOrder(models.Model):
     
     def action_create_invoice(self):
         self.ensure_one()
-        
+        invoice = self._create_invoices()
+        return {
+            'name': _('Customer Invoice'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.move',
+            'res_id': invoice.id,
+            'view_mode': 'form',
+            'target': 'current',
+        }
+    
+    def _get_invoice_partner(self):
+        self.ensure_one()
         if not self.billable:
-            raise UserError(_('This work order is not billable.'))
+            raise UserError(_('Work order %s is not billable.') % self.name)
         
         if self.invoice_id:
-            raise UserError(_('An invoice already exists for this work order.'))
+            raise UserError(_('An invoice already exists for work order %s.') % self.name)
         
         if not self.bill_to:
-            raise UserError(_('Please specify who to bill.'))
+            raise UserError(_('Please specify who to bill on work order %s.') % self.name)
         
-        # Determine the customer
         if self.bill_to == 'tenant':
             if not self.tenant_id:
-                raise UserError(_('No tenant specified for billing.'))
-            customer = self.tenant_id
+                raise UserError(_('No tenant specified for billing on work order %s.') % self.name)
+            return self.tenant_id
         elif self.bill_to == 'owner':
             if not self.owner_id:
-                raise UserError(_('No owner specified for billing.'))
-            customer = self.owner_id
-        else:
-            raise UserError(_('Cannot create invoice for company billing.'))
-        
-        # Create invoice
-        invoice_vals = {
-            'move_type': 'out_invoice',
-            'partner_id': customer.id,
-            'invoice_date': fields.Date.today(),
-            'invoice_line_ids': [(0, 0, {
-                'name': f'Work Order: {self.name} - {self.title}',
-                'quantity': 1,
-                'price_unit': self.total_cost,
-            })],
-        }
+                raise UserError(_('No owner specified for billing on work order %s.') % self.name)
+            return self.owner_id
+        raise UserError(_('Cannot create invoice for company billing (work order %s).') % self.name)
+    
+    def _prepare_invoice_lines(self, line_grouping, costs):
+        """Return the invoice line commands billing ``self``, either one
+        line per work order or one line per cost type."""
+        self.ensure_one()
+        if line_grouping == 'cost_type':
+            labels = dict(self.env['maintenance.cost.line']._fields['cost_type'].selection)
+            return [
+                (0, 0, {
+                    'name': f'Work Order: {self.name} - {self.title} ({labels.get(cost_type, cost_type)})',
+                    'quantity': 1,
+                    'price_unit': amount,
+                })
+                for cost_type, amount in sorted(costs.get(self.id, {}).items()) if amount
+            ]
+        return [(0, 0, {
+            'name': f'Work Order: {self.name} - {self.title}',
+            'quantity': 1,
+            'price_unit': self.total_cost,
+        })]
+    
+    def _create_invoices(self, line_grouping='work_order', invoice_date=None, batch_size=INVOICE_BATCH_SIZE):
+        """Invoice the work orders of ``self``, one invoice per billed
+        partner and company.
         
-        invoice = self.env['account.move'].create(invoice_vals)
-        self.write({'invoice_id': invoice.id})
+        Invoices are created ``batch_size`` at a time through a single
+        multi-create, and each one is linked back to its work orders with one
+        write.
         
-        return {
-            'name': _('Customer Invoice'),
-            'type': 'ir.actions.act_window',
-            'res_model': 'account.move',
-            'res_id': invoice.id,
-            'view_mode': 'form',
-            'target': 'current',
-        }
+        :param line_grouping: ``'work_order'`` for one line per work order,
+                              ``'cost_type'`` for one line per cost type
+        :return: the created ``account.move`` records
+        """
+        work_orders_by_key = defaultdict(lambda: self.browse())
+        for work_order in self:
+            partner = work_order._get_invoice_partner()
+            company_id = work_order.company_id.id or self.env.company.id
+            work_orders_by_key[partner.id, company_id] |= work_order
+        
+        costs = {}
+        if line_grouping == 'cost_type':
+            costs = self.env['maintenance.cost.line']._aggregate_costs(self.ids)
+        invoice_date = invoice_date or fields.Date.today()
+        
+        invoices = self.env['account.move']
+        # One run per company: the default sales journal comes from the environment's company
+        keys = sorted(work_orders_by_key, key=lambda key: (key[1], key[0]))
+        for company_id, company_keys in groupby(keys, key=lambda key: key[1]):
+            company_keys = list(company_keys)
+            Move = self.env['account.move'].with_company(company_id)
+            for index in range(0, len(company_keys), batch_size):
+                chunk_keys = company_keys[index:index + batch_size]
+                vals_list = []
+                for partner_id, company_id in chunk_keys:
+                    lines = []
+                    for work_order in work_orders_by_key[partner_id, company_id].sorted('name'):
+                        lines += work_order._prepare_invoice_lines(line_grouping, costs)
+                    vals_list.append({
+                        'move_type': 'out_invoice',
+                        'partner_id': partner_id,
+                        'company_id': company_id,
+                        'invoice_date': invoice_date,
+                        'invoice_origin': ', '.join(work_orders_by_key[partner_id, company_id].sorted('name')
+                                                    .mapped('name'))[:1000],
+                        'invoice_line_ids': lines,
+                    })
+                chunk_invoices = Move.create(vals_list)
+                for key, invoice in zip(chunk_keys, chunk_invoices):
+                    work_orders_by_key[key].write({'invoice_id': invoice.id})
+                invoices |= chunk_invoices
+        return invoices
     
     def action_view_invoice(self):
         self.ensure_one()
@@ -234,4 +544,4 @@ class WorkOrder(models.Model):
 class AccountMove(models.Model):
     _inherit = 'account.move'
     
-    work_order_id = fields.Many2one('work.order', string='Work Order', readonly=True)
+    work_order_id = fields.Many2one('work.order', string='Work Order', readonly=True, index=True)
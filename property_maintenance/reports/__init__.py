@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import maintenance_cost_report
+from . import maintenance_cost_cube
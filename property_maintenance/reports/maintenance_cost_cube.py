@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from dateutil.relativedelta import relativedelta
+import logging
+
+from ..models.work_order import CUBE_TRIGGER_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+# Cube rows of the completed work orders of %(months)s; the month filter is
+# served by the work_order_cost_month_idx expression index
+CUBE_REFRESH_QUERY = """
+    SELECT month, property_id, building_id, category_id, asset_type, cost_type, company_id,
+           SUM(amount), COUNT(*), COUNT(DISTINCT work_order_id),
+           %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+      FROM maintenance_cost_report
+     WHERE state = 'completed' AND month IN %(months)s
+     GROUP BY month, property_id, building_id, category_id, asset_type, cost_type, company_id
+"""
+
+
+class MaintenanceCostCube(models.Model):
+    _name = 'maintenance.cost.cube'
+    _description = 'Monthly Maintenance Cost Cube'
+    _order = 'month desc'
+    _rec_name = 'month'
+
+    month = fields.Date(string='Month', readonly=True, index=True)
+    property_id = fields.Many2one('property.property', string='Property', readonly=True)
+    building_id = fields.Many2one('property.building', string='Building', readonly=True)
+    category_id = fields.Many2one('maintenance.category', string='Category', readonly=True)
+    asset_type = fields.Selection(selection=lambda self: self.env['property.asset']._fields['asset_type'].selection,
+                                  string='Asset Type', readonly=True)
+    cost_type = fields.Selection([
+        ('labor', 'Labor'),
+        ('material', 'Material/Spare Parts'),
+        ('contractor', 'Contractor Service'),
+        ('other', 'Other'),
+    ], string='Cost Type', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    
+    amount = fields.Float(string='Cost', readonly=True)
+    line_count = fields.Integer(string='# Cost Lines', readonly=True)
+    work_order_count = fields.Integer(string='# Work Orders', readonly=True,
+                                      help='Distinct work orders within the cell; summing cells counts a work '
+                                           'order once per cost type it has lines for.')
+    
+    def init(self):
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS maintenance_cost_cube_dirty (month date PRIMARY KEY)
+        """)
+        # Seed every month with completed work for the first refresh
+        self.env.cr.execute("SELECT 1 FROM maintenance_cost_cube LIMIT 1")
+        if not self.env.cr.fetchone():
+            self.env.cr.execute("""
+                INSERT INTO maintenance_cost_cube_dirty (month)
+                SELECT DISTINCT date_trunc('month', COALESCE(end_date, scheduled_date))::date
+                  FROM work_order
+                 WHERE state = 'completed' AND COALESCE(end_date, scheduled_date) IS NOT NULL
+                ON CONFLICT DO NOTHING
+            """)
+    
+    @api.model
+    def _mark_months_dirty(self, dates):
+        """Flag the months containing ``dates`` for the next incremental refresh."""
+        months = {fields.Date.to_date(date).replace(day=1) for date in dates if date}
+        if months:
+            self.env.cr.execute("""
+                INSERT INTO maintenance_cost_cube_dirty (month)
+                SELECT unnest(%s::date[])
+                ON CONFLICT DO NOTHING
+            """, [list(months)])
+    
+    @api.model
+    def _mark_work_orders_dirty(self, work_orders):
+        self._mark_months_dirty(work_orders.mapped(lambda wo: wo.end_date or wo.scheduled_date))
+    
+    @api.model
+    def cron_refresh_cost_cube(self):
+        """Rebuild only the months flagged since the last run."""
+        self.env.cr.execute("DELETE FROM maintenance_cost_cube_dirty RETURNING month")
+        months = [row[0] for row in self.env.cr.fetchall()]
+        self._refresh_months(months)
+        return True
+    
+    @api.model
+    def action_rebuild_cost_cube(self):
+        """Rebuild the whole cube from the cost report view."""
+        self.env['maintenance.cost.line'].flush()
+        self.env['work.order'].flush()
+        self.env.cr.execute("SELECT DISTINCT month FROM maintenance_cost_report WHERE state = 'completed'")
+        months = [row[0] for row in self.env.cr.fetchall()]
+        self.env.cr.execute("DELETE FROM maintenance_cost_cube_dirty")
+        self.env.cr.execute("DELETE FROM maintenance_cost_cube")
+        self._refresh_months(months)
+        return True
+    
+    @api.model
+    def _refresh_months(self, months):
+        months = [month for month in months if month]
+        if not months:
+            return
+        self.env['maintenance.cost.line'].flush(['work_order_id', 'cost_type', 'subtotal', 'hours', 'quantity'])
+        self.env['work.order'].flush(list(CUBE_TRIGGER_FIELDS))
+        params = {'months': tuple(months), 'uid': self.env.uid}
+        self.env.cr.execute("DELETE FROM maintenance_cost_cube WHERE month IN %(months)s", params)
+        self.env.cr.execute("""
+            INSERT INTO maintenance_cost_cube
+                   (month, property_id, building_id, category_id, asset_type, cost_type, company_id,
+                    amount, line_count, work_order_count, create_uid, create_date, write_uid, write_date)
+        """ + CUBE_REFRESH_QUERY, params)
+        self.invalidate_cache()
+        _logger.info('Cost cube refreshed for %s month(s)', len(months))
+    
+    @api.model
+    def get_rolling_comparison(self, months=12, periods=2, end_month=None, groupby='property_id', domain=None):
+        """Compare ``periods`` consecutive windows of ``months`` months.
+        
+        The most recent window ends with ``end_month`` (current month by
+        default); e.g. ``months=12, periods=3`` gives the last three rolling
+        years. Each window is aggregated by one ``read_group`` on the cube.
+        
+        :return: list of dicts ``{'date_from', 'date_to', 'amount',
+                 'groups': {group_value: amount}}``, most recent first
+        """
+        end_month = fields.Date.to_date(end_month or fields.Date.context_today(self)).replace(day=1)
+        windows = []
+        for period in range(periods):
+            date_to = end_month - relativedelta(months=period * months)
+            date_from = date_to - relativedelta(months=months - 1)
+            groups = self.read_group(
+                (domain or []) + [('month', '>=', date_from), ('month', '<=', date_to)],
+                [groupby, 'amount'],
+                [groupby],
+                lazy=False,
+            )
+            totals = {}
+            for group in groups:
+                key = group[groupby][0] if isinstance(group[groupby], tuple) else group[groupby]
+                totals[key] = group['amount'] or 0.0
+            windows.append({
+                'date_from': date_from,
+                'date_to': date_to,
+                'amount': sum(totals.values()),
+                'groups': totals,
+            })
+        return windows
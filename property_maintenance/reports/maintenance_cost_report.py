@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, tools
+
+
+class MaintenanceCostReport(models.Model):
+    _name = 'maintenance.cost.report'
+    _description = 'Maintenance Cost Analysis Report'
+    _auto = False
+    _order = 'date desc'
+
+    work_order_id = fields.Many2one('work.order', string='Work Order', readonly=True)
+    date = fields.Date(string='Date', readonly=True, help='Completion date of the work order, or its scheduled date')
+    month = fields.Date(string='Month', readonly=True)
+    
+    property_id = fields.Many2one('property.property', string='Property', readonly=True)
+    building_id = fields.Many2one('property.building', string='Building', readonly=True)
+    unit_id = fields.Many2one('property.unit', string='Unit', readonly=True)
+    asset_id = fields.Many2one('property.asset', string='Asset', readonly=True)
+    asset_type = fields.Selection(selection=lambda self: self.env['property.asset']._fields['asset_type'].selection,
+                                  string='Asset Type', readonly=True)
+    category_id = fields.Many2one('maintenance.category', string='Category', readonly=True)
+    contractor_id = fields.Many2one('maintenance.contractor', string='Contractor', readonly=True)
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    
+    cost_type = fields.Selection([
+        ('labor', 'Labor'),
+        ('material', 'Material/Spare Parts'),
+        ('contractor', 'Contractor Service'),
+        ('other', 'Other'),
+    ], string='Cost Type', readonly=True)
+    work_type = fields.Selection([
+        ('internal', 'Internal Team'),
+        ('contractor', 'External Contractor'),
+        ('mixed', 'Mixed'),
+    ], string='Work Type', readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('scheduled', 'Scheduled'),
+        ('in_progress', 'In Progress'),
+        ('on_hold', 'On Hold'),
+        ('completed', 'Completed'),
+        ('cancelled', 'Cancelled'),
+    ], string='Status', readonly=True)
+    
+    amount = fields.Float(string='Cost', readonly=True)
+    hours = fields.Float(string='Hours', readonly=True)
+    quantity = fields.Float(string='Quantity', readonly=True)
+    line_count = fields.Integer(string='# Cost Lines', readonly=True)
+    
+    def init(self):
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        self.env.cr.execute("""
+            CREATE OR REPLACE VIEW %s AS (
+                SELECT l.id AS id,
+                       l.work_order_id AS work_order_id,
+                       COALESCE(wo.end_date, wo.scheduled_date)::date AS date,
+                       date_trunc('month', COALESCE(wo.end_date, wo.scheduled_date))::date AS month,
+                       wo.property_id AS property_id,
+                       wo.building_id AS building_id,
+                       wo.unit_id AS unit_id,
+                       wo.asset_id AS asset_id,
+                       a.asset_type AS asset_type,
+                       wo.category_id AS category_id,
+                       COALESCE(l.contractor_id, wo.contractor_id) AS contractor_id,
+                       wo.company_id AS company_id,
+                       l.cost_type AS cost_type,
+                       wo.work_type AS work_type,
+                       wo.state AS state,
+                       l.subtotal AS amount,
+                       l.hours AS hours,
+                       l.quantity AS quantity,
+                       1 AS line_count
+                  FROM maintenance_cost_line l
+                  JOIN work_order wo ON wo.id = l.work_order_id
+                  LEFT JOIN property_asset a ON a.id = wo.asset_id
+                 WHERE wo.active
+            )
+        """ % self._table)
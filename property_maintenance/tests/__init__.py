@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+from . import test_benchmark
+from . import test_bulk_tracking
+from . import test_contractor_scorecard
+from . import test_portal
+from . import test_query_plans
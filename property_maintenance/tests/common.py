@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+from datetime import timedelta
+import random
+
+# Context used to generate data: no chatter messages, followers or tracking
+GENERATION_CONTEXT = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_notrack': True,
+}
+GENERATION_BATCH_SIZE = 1000
+
+REQUEST_STAGE_CODES = ('new', 'submitted', 'approved', 'in_progress', 'on_hold', 'completed', 'closed', 'cancelled')
+WORK_ORDER_STATES = ('draft', 'scheduled', 'in_progress', 'on_hold', 'completed', 'cancelled')
+ASSET_TYPES = ('hvac', 'electrical', 'plumbing', 'elevator', 'generator', 'fire_safety')
+PM_FREQUENCIES = ('weekly', 'monthly', 'quarterly', 'semi_annual', 'annual')
+COST_TYPES = ('labor', 'material', 'contractor', 'other')
+
+
+def _iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _create_chunk(model, vals_list):
+    """Create ``vals_list`` and drop the cache, keeping memory flat
+    whatever the size of the portfolio."""
+    record_ids = model.create(vals_list).ids
+    model.env['base'].flush()
+    model.env['base'].invalidate_cache()
+    return record_ids
+
+
+def _create_batched(model, vals_iter, batch_size):
+    record_ids = []
+    for vals_list in _iter_chunks(vals_iter, batch_size):
+        record_ids += _create_chunk(model, vals_list)
+    return record_ids
+
+
+def _link_work_orders(env, request_ids, work_order_ids):
+    """Set the work order of each request with one UPDATE, as the
+    generated links differ per record."""
+    if not request_ids:
+        return
+    env.cr.execute("""
+        UPDATE maintenance_request r
+           SET work_order_id = v.work_order_id
+          FROM unnest(%s::int[], %s::int[]) AS v(id, work_order_id)
+         WHERE r.id = v.id
+    """, [request_ids, work_order_ids])
+    requests = env['maintenance.request'].browse(request_ids)
+    requests.invalidate_cache(['work_order_id'], request_ids)
+    requests.modified(['work_order_id'])
+    env['base'].flush()
+
+
+def generate_portfolio(env, properties=2, buildings=3, units=8, assets=2, requests=3, work_order_ratio=0.6,
+                       cost_lines=3, plans=2, seed=42, batch_size=GENERATION_BATCH_SIZE):
+    """Create a synthetic maintenance portfolio and return its records.
+
+    Counts other than ``properties`` are per parent: buildings per property,
+    units per building, assets and requests per unit, cost lines per work
+    order and preventive plans per building. ``work_order_ratio`` is the
+    share of requests converted to a work order. The same ``seed`` always
+    yields the same portfolio. The records are returned in ``env``.
+
+    Records are created ``batch_size`` at a time and requests are streamed
+    with their work orders and cost lines, so millions of rows can be
+    generated without holding them in memory.
+    """
+    rng = random.Random(seed)
+    result_env = env
+    env = env(context=dict(env.context, **GENERATION_CONTEXT))
+    now = fields.Datetime.now()
+    today = fields.Date.context_today(env['maintenance.request'])
+    category_ids = env['maintenance.category'].search([]).ids
+    Stage = env['maintenance.stage']
+    stage_ids = [Stage._get_stage_by_code(code).id for code in REQUEST_STAGE_CODES]
+
+    Partner = env['res.partner']
+    tenant_ids = _create_batched(Partner, ({
+        'name': 'Tenant %s' % index,
+        'is_tenant': True,
+    } for index in range(max(properties * buildings * units // 4, 1))), batch_size)
+    owner_ids = _create_batched(Partner, ({
+        'name': 'Owner %s' % index,
+        'is_property_owner': True,
+    } for index in range(max(properties, 1))), batch_size)
+
+    property_vals = [{
+        'name': 'Property %s' % index,
+        'code': 'SYN-P%s' % index,
+        'owner_id': owner_ids[index % len(owner_ids)],
+    } for index in range(properties)]
+    property_ids = _create_batched(env['property.property'], property_vals, batch_size)
+
+    building_vals = [{
+        'name': '%s / Building %s' % (prop['name'], index),
+        'code': 'B%s' % index,
+        'property_id': property_id,
+    } for property_id, prop in zip(property_ids, property_vals) for index in range(buildings)]
+    building_ids = _create_batched(env['property.building'], building_vals, batch_size)
+    owner_by_property = {property_id: prop['owner_id'] for property_id, prop in zip(property_ids, property_vals)}
+
+    unit_vals = [{
+        'name': '%s / Unit %s' % (building['name'], index),
+        'code': 'U%s' % index,
+        'property_id': building['property_id'],
+        'building_id': building_id,
+        'tenant_id': rng.choice(tenant_ids),
+        'owner_id': owner_by_property[building['property_id']],
+    } for building_id, building in zip(building_ids, building_vals) for index in range(units)]
+    unit_ids = _create_batched(env['property.unit'], unit_vals, batch_size)
+
+    asset_vals = [{
+        'name': '%s / Asset %s' % (unit['name'], index),
+        'code': 'SYN-A%s-%s' % (unit_id, index),
+        'asset_type': rng.choice(ASSET_TYPES),
+        'property_id': unit['property_id'],
+        'building_id': unit['building_id'],
+        'unit_id': unit_id,
+        'category_id': rng.choice(category_ids),
+    } for unit_id, unit in zip(unit_ids, unit_vals) for index in range(assets)]
+    asset_ids = _create_batched(env['property.asset'], asset_vals, batch_size)
+    assets_by_unit = {}
+    for asset_id, asset in zip(asset_ids, asset_vals):
+        assets_by_unit.setdefault(asset['unit_id'], []).append(asset_id)
+    del asset_vals
+
+    plan_ids = _create_batched(env['preventive.maintenance'], ({
+        'name': '%s / Plan %s' % (building['name'], index),
+        'code': 'SYN-PM%s-%s' % (building_id, index),
+        'property_id': building['property_id'],
+        'building_id': building_id,
+        'category_id': rng.choice(category_ids),
+        'frequency': rng.choice(PM_FREQUENCIES),
+        'start_date': today - timedelta(days=rng.randint(0, 365)),
+        'state': 'active',
+    } for building_id, building in zip(building_ids, building_vals) for index in range(plans)), batch_size)
+
+    request_vals_iter = ({
+        'title': 'Synthetic request %s' % index,
+        'description': '<p>Generated</p>',
+        'property_id': unit['property_id'],
+        'building_id': unit['building_id'],
+        'unit_id': unit_id,
+        'asset_id': rng.choice(assets_by_unit[unit_id]) if unit_id in assets_by_unit else False,
+        'category_id': rng.choice(category_ids),
+        'stage_id': rng.choice(stage_ids),
+        'priority': rng.choice('0123'),
+        'request_date': now - timedelta(hours=rng.randint(0, 24 * 365)),
+        'tenant_id': unit['tenant_id'],
+        'owner_id': unit['owner_id'],
+    } for unit_id, unit in zip(unit_ids, unit_vals) for index in range(requests))
+
+    request_ids, work_order_ids, cost_line_ids = [], [], []
+    for request_vals_list in _iter_chunks(request_vals_iter, batch_size):
+        chunk_request_ids = _create_chunk(env['maintenance.request'], request_vals_list)
+        converted_ids, work_order_vals = [], []
+        for request_id, request in zip(chunk_request_ids, request_vals_list):
+            if rng.random() >= work_order_ratio:
+                continue
+            scheduled_date = request['request_date'] + timedelta(days=rng.randint(0, 14))
+            state = rng.choice(WORK_ORDER_STATES)
+            converted_ids.append(request_id)
+            work_order_vals.append({
+                'title': request['title'],
+                'maintenance_request_id': request_id,
+                'property_id': request['property_id'],
+                'building_id': request['building_id'],
+                'unit_id': request['unit_id'],
+                'asset_id': request['asset_id'],
+                'category_id': request['category_id'],
+                'scheduled_date': scheduled_date,
+                'end_date': scheduled_date + timedelta(hours=rng.randint(1, 48)) if state == 'completed' else False,
+                'state': state,
+                'billable': rng.random() < 0.3,
+                'bill_to': rng.choice(('tenant', 'owner')),
+                'tenant_id': request['tenant_id'],
+                'owner_id': request['owner_id'],
+                'preventive_maintenance_id': rng.choice(plan_ids) if plan_ids and rng.random() < 0.3 else False,
+            })
+        chunk_work_order_ids = _create_chunk(env['work.order'], work_order_vals) if work_order_vals else []
+        _link_work_orders(env, converted_ids, chunk_work_order_ids)
+        cost_line_ids += _create_batched(env['maintenance.cost.line'], ({
+            'work_order_id': work_order_id,
+            'cost_type': rng.choice(COST_TYPES),
+            'description': 'Synthetic cost %s' % index,
+            'hours': rng.randint(1, 8),
+            'hourly_rate': 40.0,
+            'quantity': rng.randint(1, 5),
+            'unit_price': rng.randint(5, 200),
+        } for work_order_id in chunk_work_order_ids for index in range(cost_lines)), batch_size)
+        request_ids += chunk_request_ids
+        work_order_ids += chunk_work_order_ids
+
+    return {
+        'partners': result_env['res.partner'].browse(tenant_ids + owner_ids),
+        'properties': result_env['property.property'].browse(property_ids),
+        'buildings': result_env['property.building'].browse(building_ids),
+        'units': result_env['property.unit'].browse(unit_ids),
+        'assets': result_env['property.asset'].browse(asset_ids),
+        'plans': result_env['preventive.maintenance'].browse(plan_ids),
+        'requests': result_env['maintenance.request'].browse(request_ids),
+        'work_orders': result_env['work.order'].browse(work_order_ids),
+        'cost_lines': result_env['maintenance.cost.line'].browse(cost_line_ids),
+    }
+
+
+class MaintenancePortfolioCase(TransactionCase):
+    """Test case sharing one generated portfolio between its tests."""
+
+    portfolio_scale = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super(MaintenancePortfolioCase, cls).setUpClass()
+        cls.portfolio = generate_portfolio(cls.env, **cls.portfolio_scale)
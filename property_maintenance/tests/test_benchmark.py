@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields, release
+from odoo.tests import tagged
+from odoo.tools import config
+from datetime import timedelta
+from lxml import etree
+import json
+import logging
+import os
+import time
+
+from odoo.addons.property_maintenance.models.work_order import COST_FIELDS
+from .common import MaintenancePortfolioCase
+
+_logger = logging.getLogger(__name__)
+
+# Portfolio sizes, as arguments of generate_portfolio(). 'xlarge' makes
+# 2 million requests, 1.2 million work orders and 3.6 million cost lines.
+BENCHMARK_SCALES = {
+    'small': dict(properties=5, buildings=4, units=10, assets=2, requests=3, plans=2),
+    'medium': dict(properties=50, buildings=5, units=20, assets=2, requests=5, plans=3),
+    'large': dict(properties=200, buildings=10, units=25, assets=2, requests=10, plans=3),
+    'xlarge': dict(properties=500, buildings=10, units=40, assets=2, requests=10, plans=4),
+}
+# Records acted upon by the per-record paths (lifecycle actions, computes)
+BENCHMARK_SAMPLE_SIZE = 1000
+# Views read like the web client does, with its page sizes
+VIEW_READS = [
+    ('maintenance.request', ('tree', 'kanban')),
+    ('work.order', ('tree',)),
+    ('preventive.maintenance', ('tree',)),
+]
+LIST_LIMIT = 80
+KANBAN_LIMIT = 40
+
+# Non-stored counters of the portfolio records
+COUNT_FIELDS = [
+    ('properties', ['building_count', 'maintenance_count']),
+    ('buildings', ['unit_count', 'maintenance_count']),
+    ('units', ['asset_count', 'maintenance_count']),
+    ('assets', ['maintenance_count', 'preventive_maintenance_count']),
+    ('plans', ['work_order_count']),
+    ('requests', ['work_order_count', 'attachment_count']),
+]
+
+
+def get_benchmark_option(name, default=None):
+    """Read a benchmark option from ``PROPERTY_MAINTENANCE_BENCHMARK_<NAME>``
+    in the environment or ``property_maintenance_benchmark_<name>`` in the
+    Odoo configuration file."""
+    return (os.environ.get('PROPERTY_MAINTENANCE_BENCHMARK_%s' % name.upper())
+            or config.get('property_maintenance_benchmark_%s' % name)
+            or default)
+
+
+@tagged('-standard', 'post_install', '-at_install', 'property_maintenance_benchmark')
+class TestMaintenanceBenchmark(MaintenancePortfolioCase):
+    """Time the hot paths of the module end to end on a synthetic portfolio.
+
+    Not part of the regular test runs; start it on a scratch database with
+    ``--test-tags property_maintenance_benchmark``, choosing the size with
+    the ``scale`` option (``small``, ``medium``, ``large`` or ``xlarge``).
+    Timings, query counts and the portfolio size are written as JSON to the
+    ``output`` option, by default a file under the data directory, so runs
+    of two module versions can be compared before upgrading production.
+    Every benchmark works on the same portfolio and is rolled back.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scale = get_benchmark_option('scale', 'small')
+        if cls.scale not in BENCHMARK_SCALES:
+            raise ValueError('Unknown benchmark scale %r, expected one of %s'
+                             % (cls.scale, ', '.join(BENCHMARK_SCALES)))
+        cls.portfolio_scale = BENCHMARK_SCALES[cls.scale]
+        start = time.perf_counter()
+        super(TestMaintenanceBenchmark, cls).setUpClass()
+        cls.generation_seconds = time.perf_counter() - start
+        module = cls.env['ir.module.module'].search([('name', '=', 'property_maintenance')])
+        cls.module_version = module.latest_version
+        cls.results = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._write_results()
+        super(TestMaintenanceBenchmark, cls).tearDownClass()
+
+    @classmethod
+    def _write_results(cls):
+        timestamp = time.strftime('%Y%m%d-%H%M%S')
+        path = get_benchmark_option('output') or os.path.join(
+            config['data_dir'], 'property_maintenance_benchmark',
+            '%s-%s-%s-%s.json' % (cls.env.cr.dbname, cls.module_version, cls.scale, timestamp))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        report = {
+            'module': 'property_maintenance',
+            'module_version': cls.module_version,
+            'odoo_version': release.version,
+            'database': cls.env.cr.dbname,
+            'timestamp': timestamp,
+            'scale': cls.scale,
+            'portfolio': {name: len(records) for name, records in cls.portfolio.items()},
+            'generation_seconds': round(cls.generation_seconds, 3),
+            'results': cls.results,
+        }
+        with open(path, 'w') as result_file:
+            json.dump(report, result_file, indent=2, sort_keys=True)
+        _logger.info('Maintenance benchmark results written to %s', path)
+
+    def _measure(self, name, func, records=None):
+        """Run ``func`` with a cold cache and store its duration and query
+        count under ``name``; pending writes are flushed inside the timing."""
+        self.env['base'].flush()
+        self.env['base'].invalidate_cache()
+        query_count = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        result = func()
+        self.env['base'].flush()
+        seconds = time.perf_counter() - start
+        self.results[name] = {
+            'seconds': round(seconds, 4),
+            'queries': self.env.cr.sql_log_count - query_count,
+            'records': len(records) if records is not None else None,
+        }
+        _logger.info('Maintenance benchmark %s: %.3fs, %s queries', name, seconds, self.results[name]['queries'])
+        return result
+
+    def _sample(self, records):
+        return records[:BENCHMARK_SAMPLE_SIZE]
+
+    def test_preventive_generation(self):
+        plans = self.portfolio['plans']
+        self._measure('cron_generate_preventive_maintenance',
+                      self.env['preventive.maintenance'].cron_generate_preventive_maintenance, plans)
+
+    def test_request_lifecycle(self):
+        Request = self.env['maintenance.request']
+        requests = Request.search([('state', '=', 'new')], limit=BENCHMARK_SAMPLE_SIZE)
+        for action in ('action_submit', 'action_approve', 'action_start', 'action_complete', 'action_close'):
+            self._measure('request_%s' % action, getattr(requests, action), requests)
+        submitted = Request.search([('state', '=', 'submitted')])
+        self._measure('request_action_bulk_transition', lambda: submitted.action_bulk_transition('approved'), submitted)
+
+    def test_costs(self):
+        WorkOrder = self.env['work.order']
+        work_orders = self._sample(self.portfolio['work_orders'])
+
+        def compute_costs():
+            for fname in COST_FIELDS:
+                self.env.add_to_compute(WorkOrder._fields[fname], work_orders)
+            work_orders.recompute(COST_FIELDS)
+
+        self._measure('work_order_compute_costs', compute_costs, work_orders)
+        all_work_orders = self.portfolio['work_orders']
+        self._measure('work_order_recompute_costs', all_work_orders._recompute_costs, all_work_orders)
+
+    def test_count_computes(self):
+        for key, count_fields in COUNT_FIELDS:
+            records = self._sample(self.portfolio[key])
+            for fname in count_fields:
+                self._measure('%s_%s' % (records._name, fname), lambda: records.mapped(fname), records)
+
+    def test_cost_report(self):
+        today = fields.Date.today()
+        for group_by in ('property', 'building', 'category', 'month'):
+            wizard = self.env['maintenance.cost.analysis.wizard'].create({
+                'date_from': today - timedelta(days=365),
+                'date_to': today + timedelta(days=30),
+                'group_by': group_by,
+            })
+
+            def generate_report():
+                action = wizard.action_generate_report()
+                return self.env[action['res_model']].read_group(
+                    action['domain'], ['amount:sum'],
+                    action['context']['pivot_row_groupby'] + action['context']['pivot_column_groupby'],
+                    lazy=False,
+                )
+
+            self._measure('cost_report_by_%s' % group_by, generate_report)
+
+    def test_list_and_kanban_reads(self):
+        for model_name, view_types in VIEW_READS:
+            Model = self.env[model_name]
+            if 'tree' in view_types:
+                tree_fields = list(Model.fields_view_get(view_type='tree')['fields'])
+                self._measure('%s_list_read' % model_name,
+                              lambda: Model.web_search_read([], tree_fields, limit=LIST_LIMIT))
+            if 'kanban' in view_types:
+                kanban = Model.fields_view_get(view_type='kanban')
+                kanban_fields = list(kanban['fields'])
+                group_by = etree.fromstring(kanban['arch']).get('default_group_by')
+
+                def read_kanban():
+                    groups = Model.web_read_group([], kanban_fields, [group_by], lazy=True)['groups']
+                    for group in groups:
+                        Model.web_search_read(group['__domain'], kanban_fields, limit=KANBAN_LIMIT)
+
+                self._measure('%s_kanban_read' % model_name, read_kanban)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestBulkTracking(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestBulkTracking, cls).setUpClass()
+        cls.regular, cls.bulk = cls.env['property.property'].with_context(mail_create_nolog=True).create([
+            {'name': 'Regular Property', 'code': 'TRK-R'},
+            {'name': 'Bulk Property', 'code': 'TRK-B'},
+        ])
+
+    def _finalize_tracking(self):
+        self.env['base'].flush()
+        self.env.cr.precommit.run()
+
+    def _get_messages(self, record):
+        return self.env['mail.message'].search([('model', '=', record._name), ('res_id', '=', record.id)])
+
+    def test_regular_then_bulk_write(self):
+        self.regular.write({'name': 'Regular Property 2'})
+        self.bulk.with_bulk_tracking().write({'name': 'Bulk Property 2'})
+        self._finalize_tracking()
+
+        self.assertTrue(self._get_messages(self.regular).tracking_value_ids)
+        messages = self._get_messages(self.bulk)
+        self.assertEqual(len(messages), 1)
+        self.assertFalse(messages.tracking_value_ids)
+        self.assertIn('Bulk Property 2', messages.body)
+
+    def test_batch_then_regular_write(self):
+        self.bulk.with_bulk_tracking('batch').write({'name': 'Bulk Property 2'})
+        self.regular.write({'name': 'Regular Property 2'})
+        self._finalize_tracking()
+
+        self.assertFalse(self._get_messages(self.bulk))
+        operation = self.env['maintenance.bulk.operation'].search([('res_model', '=', 'property.property')])
+        self.assertEqual(operation.record_count, 1)
+        self.assertIn('Bulk Property 2', operation.details)
+        self.assertTrue(self._get_messages(self.regular).tracking_value_ids)
+
+    def test_regular_write_wins_on_same_record(self):
+        self.bulk.with_bulk_tracking().write({'name': 'Bulk Property 2'})
+        self.bulk.write({'name': 'Bulk Property 3'})
+        self._finalize_tracking()
+
+        self.assertTrue(self._get_messages(self.bulk).tracking_value_ids)
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestContractorScorecard(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestContractorScorecard, cls).setUpClass()
+        cls.category = cls.env['maintenance.category'].create({'name': 'Scorecard Category', 'code': 'SCORE'})
+        cls.contractor = cls.env['maintenance.contractor'].create({
+            'name': 'Scorecard Contractor',
+            'partner_id': cls.env['res.partner'].create({'name': 'Scorecard Vendor'}).id,
+            'rating': '5',
+        })
+        cls.scorecard = cls.env['maintenance.contractor.scorecard'].create({
+            'contractor_id': cls.contractor.id,
+            'category_id': cls.category.id,
+            'on_time_rate': 100.0,
+            'avg_cost': 100.0,
+        })
+        cls.scorecard._update_scores({cls.category.id})
+
+    def test_rating_change_rescores(self):
+        self.assertAlmostEqual(self.scorecard.score, 1.0)
+        self.contractor.rating = '1'
+        self.assertAlmostEqual(self.scorecard.score, 0.84)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests import tagged
+from unittest.mock import Mock, patch
+
+from odoo.addons.property_maintenance.controllers import portal
+from .common import MaintenancePortfolioCase
+
+
+@tagged('post_install', '-at_install')
+class TestPortalPaging(MaintenancePortfolioCase):
+    """The portfolio is generated in one transaction: all its requests share
+    the same ``create_date`` and are told apart by their id only."""
+
+    portfolio_scale = dict(properties=1, buildings=1, units=2, assets=0, requests=25, plans=0)
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestPortalPaging, cls).setUpClass()
+        requests = cls.portfolio['requests']
+        cls.tenant = requests[0].tenant_id
+        cls.tenant_user = cls.env['res.users'].with_context(no_reset_password=True).create({
+            'name': 'Paging Tenant',
+            'login': 'paging_tenant',
+            'partner_id': cls.tenant.id,
+            'groups_id': [(6, 0, [cls.env.ref('property_maintenance.group_maintenance_portal_tenant').id])],
+        })
+        cls.expected = requests.filtered(lambda r: r.tenant_id == cls.tenant).sorted(
+            lambda r: (r.create_date, r.id), reverse=True)
+
+    def _seek(self, **kw):
+        controller = portal.MaintenancePortal()
+        with patch.object(portal, 'request', Mock(env=self.env(user=self.tenant_user))):
+            return controller._seek_maintenance_requests(controller._get_maintenance_request_domain(), **kw)
+
+    def test_page_through_one_transaction(self):
+        self.assertGreater(len(self.expected), 2 * portal.PORTAL_PAGE_SIZE)
+        self.assertEqual(len(set(self.expected.mapped('create_date'))), 1)
+        pages = []
+        requests, has_previous, has_next = self._seek()
+        self.assertFalse(has_previous)
+        pages.append(requests)
+        while has_next:
+            requests, has_previous, has_next = self._seek(after=portal.MaintenancePortal._encode_cursor(requests[-1]))
+            self.assertTrue(has_previous)
+            pages.append(requests)
+        self.assertEqual([r.id for page in pages for r in page], self.expected.ids)
+
+        # Back from the last page to the one before it
+        requests, has_previous, has_next = self._seek(before=portal.MaintenancePortal._encode_cursor(pages[-1][0]))
+        self.assertEqual(requests.ids, pages[-2].ids)
+        self.assertTrue(has_next)
+
+    def test_cursor_round_trip(self):
+        request = self.expected[0]
+        cursor = portal.MaintenancePortal._encode_cursor(request)
+        self.assertEqual(portal.MaintenancePortal._decode_cursor(cursor), (request.create_date, request.id))
+        self.assertIsNone(portal.MaintenancePortal._decode_cursor('garbage'))
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.tests import tagged
+from datetime import datetime, time, timedelta
+import json
+
+from odoo.addons.property_maintenance.models.maintenance_request import OPEN_REQUEST_STATES
+from odoo.addons.property_maintenance.reports.maintenance_cost_cube import CUBE_REFRESH_QUERY
+from .common import MaintenancePortfolioCase
+
+# Tables whose scans must be driven by an index condition
+CHECKED_TABLES = {
+    'property_property', 'property_building', 'property_unit', 'property_asset', 'maintenance_request',
+    'work_order', 'preventive_maintenance', 'maintenance_cost_line',
+}
+SCAN_NODE_TYPES = ('Seq Scan', 'Index Scan', 'Index Only Scan')
+
+
+@tagged('post_install', '-at_install')
+class TestQueryPlans(MaintenancePortfolioCase):
+    """EXPLAIN the module's own domains, with their record rules, against a
+    generated portfolio and fail on any sequential or unbounded index scan.
+
+    Sequential scans are disabled while planning so that the small test
+    tables give the plans of a production-sized database: whenever a usable
+    index exists, it is chosen.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(TestQueryPlans, cls).setUpClass()
+        group_manager = cls.env.ref('property_maintenance.group_maintenance_manager')
+        group_tenant = cls.env.ref('property_maintenance.group_maintenance_portal_tenant')
+        group_owner = cls.env.ref('property_maintenance.group_maintenance_portal_owner')
+        Users = cls.env['res.users'].with_context(no_reset_password=True)
+        cls.manager = Users.create({
+            'name': 'Plan Manager',
+            'login': 'plan_manager',
+            'groups_id': [(6, 0, [group_manager.id])],
+        })
+        requests = cls.portfolio['requests']
+        cls.tenant_user = Users.create({
+            'name': 'Plan Tenant',
+            'login': 'plan_tenant',
+            'partner_id': requests[0].tenant_id.id,
+            'groups_id': [(6, 0, [group_tenant.id])],
+        })
+        cls.owner_user = Users.create({
+            'name': 'Plan Owner',
+            'login': 'plan_owner',
+            'partner_id': requests[0].owner_id.id,
+            'groups_id': [(6, 0, [group_owner.id])],
+        })
+        cls.env['base'].flush()
+        cls.env.cr.execute('ANALYZE %s' % ', '.join(sorted(CHECKED_TABLES)))
+
+    def _explain(self, model, domain, order=None, limit=None):
+        query = model._search(domain, order=order, limit=limit)
+        return self._explain_query(*query.select())
+
+    def _explain_query(self, query_str, params):
+        self.env.cr.execute('SET enable_seqscan = off')
+        try:
+            self.env.cr.execute('EXPLAIN (FORMAT JSON) ' + query_str, params)
+            plan = self.env.cr.fetchone()[0]
+        finally:
+            self.env.cr.execute('RESET enable_seqscan')
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]['Plan']
+
+    def _get_unbounded_scans(self, plan):
+        """Return the scans of ``plan`` reading a checked table in full."""
+        scans = []
+        nodes = [plan]
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get('Plans', []))
+            if node['Node Type'] not in SCAN_NODE_TYPES or node.get('Relation Name') not in CHECKED_TABLES:
+                continue
+            if node['Node Type'] == 'Seq Scan' or not node.get('Index Cond'):
+                scans.append('%s on %s' % (node['Node Type'], node['Relation Name']))
+        return scans
+
+    def assertIndexed(self, model, domain, order=None, limit=None):
+        plan = self._explain(model, domain, order=order, limit=limit)
+        scans = self._get_unbounded_scans(plan)
+        self.assertFalse(scans, 'Full scans for %s %s: %s' % (model._name, domain, ', '.join(scans)))
+
+    def test_count_domains(self):
+        """Relation counters, bare and with the multi-company rules of an internal user."""
+        portfolio = self.portfolio
+        counters = [
+            ('maintenance.request', 'property_id', portfolio['properties']),
+            ('maintenance.request', 'building_id', portfolio['buildings']),
+            ('maintenance.request', 'unit_id', portfolio['units']),
+            ('maintenance.request', 'asset_id', portfolio['assets']),
+            ('property.building', 'property_id', portfolio['properties']),
+            ('property.unit', 'building_id', portfolio['buildings']),
+            ('property.asset', 'unit_id', portfolio['units']),
+            ('preventive.maintenance', 'asset_id', portfolio['assets']),
+            ('work.order', 'preventive_maintenance_id', portfolio['plans']),
+            ('maintenance.cost.line', 'work_order_id', portfolio['work_orders']),
+        ]
+        for model_name, field_name, records in counters:
+            for user in (self.env.user, self.manager):
+                with self.subTest(model=model_name, field=field_name, user=user.login):
+                    self.assertIndexed(self.env[model_name].with_user(user), [(field_name, 'in', records[:20].ids)])
+
+    def test_portal_rules(self):
+        """Portal lists of tenants and owners, as seeked by the portal."""
+        order = 'create_date desc, id desc'
+        for user in (self.tenant_user, self.owner_user):
+            with self.subTest(user=user.login):
+                self.assertIndexed(self.env['maintenance.request'].with_user(user), [], order=order, limit=21)
+
+    def test_open_requests_by_sla_deadline(self):
+        self.assertIndexed(self.env['maintenance.request'].with_user(self.manager), [
+            ('state', 'in', OPEN_REQUEST_STATES),
+            ('sla_deadline', '<=', fields.Datetime.now()),
+        ], order='sla_deadline')
+
+    def test_due_preventive_plans(self):
+        self.assertIndexed(self.env['preventive.maintenance'], [
+            ('state', '=', 'active'),
+            ('next_execution_date', '<=', fields.Date.today() + timedelta(days=30)),
+        ])
+
+    def test_plan_work_orders_by_date(self):
+        """Duplicate check of preventive work order generation."""
+        day = fields.Date.today()
+        self.assertIndexed(self.env['work.order'], [
+            ('preventive_maintenance_id', '=', self.portfolio['plans'][0].id),
+            ('scheduled_date', '>=', datetime.combine(day, time.min)),
+            ('scheduled_date', '<=', datetime.combine(day, time.max)),
+        ], limit=1)
+
+    def test_wizard_domains(self):
+        today = fields.Date.today()
+        WorkOrder = self.env['work.order'].with_user(self.manager)
+        with self.subTest(wizard='dispatch'):
+            self.assertIndexed(WorkOrder, [
+                ('state', 'in', ('draft', 'scheduled')),
+                ('technician_ids', '=', False),
+                ('scheduled_date', '>=', datetime.combine(today, time.min)),
+                ('scheduled_date', '<=', datetime.combine(today + timedelta(days=7), time.max)),
+            ])
+        with self.subTest(wizard='invoice'):
+            self.assertIndexed(WorkOrder, [
+                ('state', '=', 'completed'),
+                ('billable', '=', True),
+                ('invoice_id', '=', False),
+                ('end_date', '<=', datetime.combine(today, time.max)),
+                ('bill_to', 'in', ('tenant', 'owner')),
+            ])
+
+    def test_cost_cube_refresh(self):
+        """Incremental refresh of the cost cube, over the cost report view."""
+        completed = self.portfolio['work_orders'].filtered(lambda wo: wo.state == 'completed')
+        months = sorted({(wo.end_date or wo.scheduled_date).date().replace(day=1) for wo in completed})
+        self.assertTrue(months)
+        plan = self._explain_query(CUBE_REFRESH_QUERY, {'months': tuple(months[:3]), 'uid': self.env.uid})
+        scans = self._get_unbounded_scans(plan)
+        self.assertFalse(scans, 'Full scans for the cost cube refresh: %s' % ', '.join(scans))
@@ -2,3 +2,6 @@
 
 from . import convert_to_work_order
 from . import maintenance_cost_analysis
+from . import maintenance_request_transition
+from . import work_order_dispatch
+from . import work_order_invoice
@@ -42,6 +42,12 @@ class ConvertToWorkOrderWizard(models.TransientModel):
         ('company', 'Company'),
     ], string='Bill To')
     
+    @api.onchange('work_type', 'category_id')
+    def _onchange_suggest_contractor(self):
+        if self.work_type in ('contractor', 'mixed') and self.category_id and not self.contractor_id:
+            self.contractor_id = self.env['maintenance.contractor.scorecard']._rank_contractors(
+                self.category_id.id, self.env.company.id, limit=1)
+    
     @api.onchange('maintenance_request_id')
     def _onchange_maintenance_request(self):
         if self.maintenance_request_id:
@@ -77,6 +83,7 @@ class ConvertToWorkOrderWizard(models.TransientModel):
             'team_id': self.team_id.id if self.team_id else False,
             'contractor_id': self.contractor_id.id if self.contractor_id else False,
             'scheduled_date': self.scheduled_date,
+            'estimated_duration': self.estimated_duration,
             'billable': self.billable,
             'bill_to': self.bill_to,
             'tenant_id': self.maintenance_request_id.tenant_id.id if self.maintenance_request_id.tenant_id else False,
@@ -94,7 +101,7 @@ class ConvertToWorkOrderWizard(models.TransientModel):
         self.maintenance_request_id.write({'work_order_id': work_order.id})
         
         # Update maintenance request stage
-        approved_stage = self.env['maintenance.stage'].search([('code', '=', 'approved')], limit=1)
+        approved_stage = self.env['maintenance.stage']._get_stage_by_code('approved')
         if approved_stage:
             self.maintenance_request_id.write({'stage_id': approved_stage.id})
         
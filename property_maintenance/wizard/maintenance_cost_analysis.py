@@ -26,13 +26,11 @@ class MaintenanceCostAnalysisWizard(models.TransientModel):
         ('month', 'Month'),
     ], string='Group By', default='property', required=True)
     
-    def action_generate_report(self):
+    def _get_report_domain(self):
         self.ensure_one()
-        
-        # Build domain
         domain = [
-            ('create_date', '>=', self.date_from),
-            ('create_date', '<=', self.date_to),
+            ('date', '>=', self.date_from),
+            ('date', '<=', self.date_to),
             ('state', '=', 'completed'),
         ]
         
@@ -51,27 +49,24 @@ class MaintenanceCostAnalysisWizard(models.TransientModel):
         if self.category_ids:
             domain.append(('category_id', 'in', self.category_ids.ids))
         
-        # Find work orders
-        work_orders = self.env['work.order'].search(domain)
+        return domain
+    
+    def action_generate_report(self):
+        self.ensure_one()
         
-        # Generate analysis data
-        analysis_data = {
-            'date_from': self.date_from,
-            'date_to': self.date_to,
-            'total_cost': sum(work_orders.mapped('total_cost')),
-            'labor_cost': sum(work_orders.mapped('labor_cost')),
-            'material_cost': sum(work_orders.mapped('material_cost')),
-            'contractor_cost': sum(work_orders.mapped('contractor_cost')),
-            'work_order_count': len(work_orders),
-        }
+        # Aggregation happens in PostgreSQL through the report view
+        groupby = 'month:month' if self.group_by == 'month' else '%s_id' % self.group_by
         
         return {
             'name': _('Maintenance Cost Analysis'),
             'type': 'ir.actions.act_window',
-            'res_model': 'work.order',
-            'view_mode': 'tree,pivot,graph',
-            'domain': domain,
+            'res_model': 'maintenance.cost.report',
+            'view_mode': 'pivot,graph,tree',
+            'domain': self._get_report_domain(),
             'context': {
-                'search_default_group_by_%s' % self.group_by: 1,
+                'pivot_row_groupby': [groupby],
+                'pivot_column_groupby': ['cost_type'],
+                'pivot_measures': ['amount'],
+                'graph_groupbys': [groupby, 'cost_type'],
             },
         }
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+
+
+class MaintenanceRequestTransitionWizard(models.TransientModel):
+    _name = 'maintenance.request.transition.wizard'
+    _description = 'Bulk Maintenance Request Stage Change'
+
+    request_ids = fields.Many2many('maintenance.request', string='Maintenance Requests',
+                                   default=lambda self: self._default_request_ids())
+    request_count = fields.Integer(string='Requests', compute='_compute_request_count')
+    
+    target_code = fields.Selection([
+        ('submitted', 'Submitted'),
+        ('approved', 'Approved'),
+        ('in_progress', 'In Progress'),
+        ('on_hold', 'On Hold'),
+        ('completed', 'Completed'),
+        ('closed', 'Closed'),
+        ('cancelled', 'Cancelled'),
+    ], string='Move To', required=True, default='closed')
+    
+    @api.model
+    def _default_request_ids(self):
+        if self._context.get('active_model') == 'maintenance.request':
+            return [(6, 0, self._context.get('active_ids', []))]
+        return []
+    
+    @api.depends('request_ids')
+    def _compute_request_count(self):
+        for wizard in self:
+            wizard.request_count = len(wizard.request_ids)
+    
+    def action_apply(self):
+        self.ensure_one()
+        result = self.request_ids.action_bulk_transition(self.target_code)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Stage Change'),
+                'message': _('%(moved)s request(s) moved, %(skipped)s skipped (transition not allowed).') % result,
+                'type': 'success' if not result['skipped'] else 'warning',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from datetime import datetime, time, timedelta
+
+
+class WorkOrderDispatchWizard(models.TransientModel):
+    _name = 'work.order.dispatch.wizard'
+    _description = 'Dispatch Work Orders to Technicians'
+
+    date_from = fields.Date(string='From', required=True,
+                            default=lambda self: fields.Date.context_today(self) + timedelta(days=1))
+    date_to = fields.Date(string='To', required=True,
+                          default=lambda self: fields.Date.context_today(self) + timedelta(days=1))
+    team_id = fields.Many2one('maintenance.team', string='Maintenance Team')
+    work_order_ids = fields.Many2many('work.order', string='Work Orders',
+                                      default=lambda self: self._default_work_order_ids())
+    
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('done', 'Done'),
+    ], string='Status', default='draft')
+    assigned_count = fields.Integer(string='Assigned', readonly=True)
+    conflict_count = fields.Integer(string='Conflicts', readonly=True)
+    conflict_ids = fields.One2many('work.order.dispatch.conflict', 'wizard_id', string='Conflict Report',
+                                   readonly=True)
+    
+    @api.model
+    def _default_work_order_ids(self):
+        if self._context.get('active_model') == 'work.order':
+            return [(6, 0, self._context.get('active_ids', []))]
+        return []
+    
+    def _get_work_orders(self):
+        self.ensure_one()
+        if self.work_order_ids:
+            return self.work_order_ids
+        domain = [
+            ('state', 'in', ('draft', 'scheduled')),
+            ('technician_ids', '=', False),
+            ('scheduled_date', '>=', datetime.combine(self.date_from, time.min)),
+            ('scheduled_date', '<=', datetime.combine(self.date_to, time.max)),
+        ]
+        if self.team_id:
+            domain.append(('team_id', '=', self.team_id.id))
+        return self.env['work.order'].search(domain)
+    
+    def action_dispatch(self):
+        self.ensure_one()
+        work_orders = self._get_work_orders()
+        conflicts = work_orders._dispatch_technicians()
+        self.write({
+            'state': 'done',
+            'assigned_count': len(work_orders.filtered('technician_ids')),
+            'conflict_count': len(conflicts),
+            'conflict_ids': [(5, 0, 0)] + [(0, 0, conflict) for conflict in conflicts],
+        })
+        return {
+            'name': _('Dispatch Work Orders'),
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+    
+    def action_view_conflicts(self):
+        self.ensure_one()
+        return {
+            'name': _('Unassigned Work Orders'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'work.order',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', self.conflict_ids.work_order_id.ids)],
+        }
+
+
+class WorkOrderDispatchConflict(models.TransientModel):
+    _name = 'work.order.dispatch.conflict'
+    _description = 'Work Order Dispatch Conflict'
+    _order = 'scheduled_date, id'
+
+    wizard_id = fields.Many2one('work.order.dispatch.wizard', string='Wizard', required=True, ondelete='cascade')
+    work_order_id = fields.Many2one('work.order', string='Work Order', required=True, ondelete='cascade')
+    scheduled_date = fields.Datetime(related='work_order_id.scheduled_date', string='Scheduled Date')
+    category_id = fields.Many2one(related='work_order_id.category_id', string='Category')
+    reason = fields.Selection([
+        ('no_technician', 'No Qualified Technician'),
+        ('busy', 'All Qualified Technicians Booked'),
+    ], string='Reason', required=True)
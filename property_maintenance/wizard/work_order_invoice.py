@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from datetime import datetime, time
+
+
+class WorkOrderInvoiceWizard(models.TransientModel):
+    _name = 'work.order.invoice.wizard'
+    _description = 'Batch Invoice Work Orders'
+
+    work_order_ids = fields.Many2many('work.order', string='Work Orders',
+                                      default=lambda self: self._default_work_order_ids())
+    date_to = fields.Date(string='Completed Until', required=True, default=fields.Date.context_today)
+    bill_to = fields.Selection([
+        ('all', 'Tenants and Owners'),
+        ('tenant', 'Tenants'),
+        ('owner', 'Owners'),
+    ], string='Bill To', required=True, default='all')
+    line_grouping = fields.Selection([
+        ('work_order', 'One Line per Work Order'),
+        ('cost_type', 'One Line per Cost Type'),
+    ], string='Invoice Lines', required=True, default='work_order')
+    invoice_date = fields.Date(string='Invoice Date', required=True, default=fields.Date.context_today)
+    
+    @api.model
+    def _default_work_order_ids(self):
+        if self._context.get('active_model') == 'work.order':
+            return [(6, 0, self._context.get('active_ids', []))]
+        return []
+    
+    def _get_work_orders(self):
+        """Completed billable work orders not invoiced yet, restricted to
+        the selected ones when the wizard was opened from a list."""
+        self.ensure_one()
+        domain = [
+            ('state', '=', 'completed'),
+            ('billable', '=', True),
+            ('invoice_id', '=', False),
+            ('end_date', '<=', datetime.combine(self.date_to, time.max)),
+            ('bill_to', 'in', ('tenant', 'owner') if self.bill_to == 'all' else (self.bill_to,)),
+        ]
+        if self.work_order_ids:
+            domain.append(('id', 'in', self.work_order_ids.ids))
+        return self.env['work.order'].search(domain)
+    
+    def action_create_invoices(self):
+        self.ensure_one()
+        work_orders = self._get_work_orders()
+        if not work_orders:
+            raise UserError(_('There is no completed billable work order left to invoice.'))
+        invoices = work_orders._create_invoices(line_grouping=self.line_grouping, invoice_date=self.invoice_date)
+        return {
+            'name': _('Customer Invoices'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'account.move',
+            'view_mode': 'tree,form',
+            'domain': [('id', 'in', invoices.ids)],
+            'context': {'default_move_type': 'out_invoice'},
+        }